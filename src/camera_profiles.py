@@ -0,0 +1,158 @@
+import os
+import json
+import cv2
+import numpy as np
+
+
+DEFAULT_PROFILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "camera_profiles.json")
+
+# Fallback when no config file is present (same rectangles as the original ROI)
+BUILTIN_PROFILES = {
+    "bike": {
+        # Side-mounted, angled left: road is center-left and lower portion
+        "polygon": [[0.25, 0.50], [0.65, 0.50], [0.65, 1.0], [0.25, 1.0]]
+    },
+    "van": {
+        # Top-mounted, angled down+forward: road is center and lower portion
+        "polygon": [[0.30, 0.60], [0.70, 0.60], [0.70, 1.0], [0.30, 1.0]]
+    },
+}
+
+
+class RoiGeometry:
+    """
+    Road region of one profile at one frame resolution.
+
+    Computed once and shared by every analyzer/visualizer:
+    - polygon: (N, 1, 2) int32 pixel vertices, for drawing
+    - bbox: (x1, y1, x2, y2) bounding crop, slice-ready
+    - mask: crop-sized uint8 0/255 mask, None when the polygon is the full crop
+    - pixel_count: number of ROI pixels (mask area)
+    """
+
+    def __init__(self, polygon_ratios, frame_h, frame_w):
+        pts = np.array(
+            [[int(frame_w * x), int(frame_h * y)] for x, y in polygon_ratios],
+            dtype=np.int32
+        )
+        pts[:, 0] = np.clip(pts[:, 0], 0, frame_w)
+        pts[:, 1] = np.clip(pts[:, 1], 0, frame_h)
+
+        x1, y1 = pts.min(axis=0)
+        x2, y2 = pts.max(axis=0)
+
+        self.polygon = pts.reshape(-1, 1, 2)
+        self.bbox = (int(x1), int(y1), int(x2), int(y2))
+
+        crop_h, crop_w = int(y2 - y1), int(x2 - x1)
+
+        if self._is_axis_aligned_rect(pts):
+            self.mask = None
+            self.pixel_count = crop_h * crop_w
+        else:
+            self.mask = np.zeros((crop_h, crop_w), dtype=np.uint8)
+            cv2.fillPoly(self.mask, [pts - np.array([x1, y1], dtype=np.int32)], 255)
+            self.pixel_count = cv2.countNonZero(self.mask)
+
+    @staticmethod
+    def _is_axis_aligned_rect(pts):
+        if len(pts) != 4:
+            return False
+        xs = set(pts[:, 0].tolist())
+        ys = set(pts[:, 1].tolist())
+        return len(xs) == 2 and len(ys) == 2
+
+    def crop(self, frame):
+        x1, y1, x2, y2 = self.bbox
+        return frame[y1:y2, x1:x2]
+
+
+
+class CameraProfileRegistry:
+    """
+    Named camera profiles, each defining the road region as a polygon in
+    frame ratios. Switchable at runtime; geometry cached per resolution.
+
+    Config file (JSON):
+        {
+            "active": "bike",
+            "profiles": {
+                "bike": {"polygon": [[x, y], ...]},
+                ...
+            }
+        }
+    """
+
+    def __init__(self, profiles=None, active="bike"):
+        self.profiles = dict(profiles or BUILTIN_PROFILES)
+        self._geometry_cache = {}
+        self.active = None
+        self.set_active(active)
+
+    @classmethod
+    def load(cls, path=None, active=None):
+        """
+        Built-in profiles overlaid with the config file (if it exists).
+
+        Args:
+            path: config file, defaults to camera_profiles.json next to this module
+            active: override the file's active profile
+        """
+        path = path or DEFAULT_PROFILE_PATH
+        profiles = dict(BUILTIN_PROFILES)
+        file_active = "bike"
+
+        if os.path.exists(path):
+            with open(path) as f:
+                config = json.load(f)
+            profiles.update(config.get("profiles", {}))
+            file_active = config.get("active", file_active)
+
+        return cls(profiles, active or file_active)
+
+    def set_active(self, name):
+        """
+        Switch profile at runtime (geometry of other profiles stays cached).
+        """
+        if name not in self.profiles:
+            raise KeyError(f"Unknown camera profile: {name}")
+
+        polygon = self.profiles[name]["polygon"]
+        if len(polygon) < 3:
+            raise ValueError(f"Camera profile {name} needs at least 3 polygon points")
+
+        self.active = name
+
+    def next_profile(self):
+        """
+        Cycle to the next profile (debug key binding).
+        """
+        names = list(self.profiles)
+        self.set_active(names[(names.index(self.active) + 1) % len(names)])
+        return self.active
+
+    def geometry(self, frame_shape):
+        """
+        Cached RoiGeometry of the active profile for frame_shape (H, W, ...).
+        """
+        key = (self.active, frame_shape[0], frame_shape[1])
+        geometry = self._geometry_cache.get(key)
+
+        if geometry is None:
+            geometry = RoiGeometry(self.profiles[self.active]["polygon"], frame_shape[0], frame_shape[1])
+            self._geometry_cache[key] = geometry
+
+        return geometry
+
+    @property
+    def roi_config(self):
+        """
+        Bounding ratios of the active profile (legacy rectangle format).
+        """
+        polygon = self.profiles[self.active]["polygon"]
+        return {
+            "x_start_ratio": min(x for x, _ in polygon),
+            "x_end_ratio": max(x for x, _ in polygon),
+            "y_start_ratio": min(y for _, y in polygon),
+            "y_end_ratio": max(y for _, y in polygon),
+        }
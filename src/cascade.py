@@ -0,0 +1,134 @@
+class CascadeController:
+	"""
+	Surface-first cascade: decide per frame whether YOLO is worth running
+
+	Escalates to detection when:
+	- the surface score nears SegmentAnalyzer.SURFACE_ACCUMULATION_THRESHOLD
+	- the segment state sits near a hysteresis edge (avg score near the
+	  ON/OFF threshold or dirty distance near the trigger / release point)
+	- the low-rate sampling schedule is due
+	Once escalated, detection stays on for hold_frames so tracks can mature
+	(Tracker min_age) before falling back to surface-only. Scheduled samples
+	only arm sample_hold_frames, so a clean road stays mostly surface-only.
+	"""
+
+	def __init__(
+		self,
+		segment_analyzer,
+		surface_margin = 0.8,
+		score_margin = 0.1,
+		distance_margin = 0.25,
+		sample_every = 30,
+		hold_frames = 15,
+		sample_hold_frames = 4
+	):
+		"""
+		surface_margin:
+			Escalate when surface score > surface_margin * accumulation threshold
+
+		score_margin:
+			Escalate when avg score is within this of the active hysteresis threshold
+
+		distance_margin:
+			Escalate when dirty distance is within this fraction of the trigger
+			(or release point while cleaning is required)
+
+		sample_every:
+			Escalate at least every N frames (keeps object score fresh)
+
+		hold_frames:
+			Frames detection stays on after a surface / hysteresis escalation
+
+		sample_hold_frames:
+			Frames detection stays on after a scheduled sample (Tracker min_age)
+		"""
+
+		self.segment_analyzer = segment_analyzer
+		self.surface_margin = surface_margin
+		self.score_margin = score_margin
+		self.distance_margin = distance_margin
+		self.sample_every = sample_every
+		self.hold_frames = hold_frames
+		self.sample_hold_frames = sample_hold_frames
+
+		self.hold_remaining = 0
+		self.frames_since_detection = 0
+
+		# Diagnostics
+		self.total_frames = 0
+		self.escalated_frames = 0
+		self.reasons = {"surface": 0, "hysteresis": 0, "sample": 0}
+
+	def _escalation_reason(self, surface_score):
+		sa = self.segment_analyzer
+
+		if surface_score > self.surface_margin * sa.SURFACE_ACCUMULATION_THRESHOLD:
+			return "surface"
+
+		state = sa.last_state
+		if state is not None:
+			if sa.requires_cleaning:
+				score_edge = sa.CLEANING_OFF_THRESHOLD
+				distance_edge = sa.DIRTY_DISTANCE_TRIGGER * 0.5
+			else:
+				score_edge = sa.CLEANING_ON_THRESHOLD
+				distance_edge = sa.DIRTY_DISTANCE_TRIGGER
+
+			if abs(state["avg_score"] - score_edge) < self.score_margin:
+				return "hysteresis"
+			if abs(state["dirty_distance_m"] - distance_edge) < self.distance_margin * distance_edge:
+				return "hysteresis"
+
+		if self.frames_since_detection >= self.sample_every:
+			return "sample"
+
+		return None
+
+	def should_detect(self, surface_score, allowed = True):
+		"""
+		Call on every frame so counters and the sampling schedule advance.
+
+		Args:
+			surface_score: this frame's SurfaceAnalyzer score (computed first)
+			allowed: False when detection is ruled out anyway (motion gate,
+			         quality controller cadence)
+
+		Returns:
+			bool: True if YOLO should run on this frame
+		"""
+
+		self.total_frames += 1
+
+		reason = self._escalation_reason(surface_score)
+		if reason is not None:
+			self.reasons[reason] += 1
+			hold = self.sample_hold_frames if reason == "sample" else self.hold_frames
+			self.hold_remaining = max(self.hold_remaining, hold)
+
+		wanted = self.hold_remaining > 0
+		if wanted:
+			self.hold_remaining -= 1
+
+		detect = wanted and allowed
+		if detect:
+			self.escalated_frames += 1
+			self.frames_since_detection = 0
+		else:
+			self.frames_since_detection += 1
+
+		return detect
+
+	@property
+	def escalated_fraction(self):
+		return self.escalated_frames / max(self.total_frames, 1)
+
+	def get_diagnostics(self):
+		"""
+		Return diagnostic info for tuning and debugging.
+		"""
+
+		return {
+			"escalated_fraction": f"{self.escalated_fraction * 100:.1f}%",
+			"reasons": dict(self.reasons),
+			"total_frames": self.total_frames
+		}
@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import threading
+
+
+class StateCheckpointer:
+	"""
+	Periodic checkpoint and warm restore of pipeline state
+
+	- Snapshot: Tracker tracks, SurfaceAnalyzer / SegmentAnalyzer windows,
+	  dirty_distance_m and requires_cleaning (small versioned JSON)
+	- Captured in the frame loop (a few dozen numbers), written by a
+	  background thread with atomic file replacement (tmp + fsync + rename)
+	- Restored on startup unless older than max_age_s, from another version,
+	  or saved for another run context (source, working frame shape, camera
+	  profile): pixel-space tracks and ROI-scale surface windows are
+	  meaningless on a different frame
+	"""
+
+	VERSION = 2
+
+	def __init__(self, path = "pipeline_state.json", interval_s = 5.0, max_age_s = 300.0):
+		"""
+		path:
+			Checkpoint file
+
+		interval_s:
+			Minimum time between snapshots
+
+		max_age_s:
+			Snapshots older than this are discarded on restore (the vehicle
+			has probably moved to an unrelated road)
+		"""
+
+		self.path = path
+		self.interval_s = interval_s
+		self.max_age_s = max_age_s
+
+		self.last_capture = 0.0
+		self.writes = 0
+		self.write_errors = 0
+
+		self._pending = None
+		self._closed = False
+		self._cond = threading.Condition()
+		self._worker = threading.Thread(target = self._run, daemon = True)
+		self._worker.start()
+
+	@staticmethod
+	def run_context(source, frame_shape, profile):
+		"""
+		JSON-comparable description of what the state was computed on
+		"""
+
+		return {"source": str(source), "frame_shape": list(frame_shape), "profile": profile}
+
+	def restore(self, tracker, surface_analyzer, segment_analyzer, context = None, now = None):
+		"""
+		Load the checkpoint into the stages if it is recent and compatible
+
+		context:
+			run_context() of this run; the snapshot's must match
+
+		Returns:
+			bool: True if state was restored
+		"""
+
+		if not os.path.exists(self.path):
+			return False
+
+		try:
+			with open(self.path) as f:
+				snapshot = json.load(f)
+		except (OSError, ValueError):
+			return False
+
+		if not isinstance(snapshot, dict) or snapshot.get("version") != self.VERSION:
+			return False
+
+		# Negative age: clock behind the snapshot (no RTC after a power cycle),
+		# so its age is unknown
+		now = time.time() if now is None else now
+		age = now - snapshot.get("saved_at", 0.0)
+		if not 0.0 <= age <= self.max_age_s:
+			return False
+
+		if snapshot.get("context") != context:
+			print(f"StateCheckpointer: checkpoint is for {snapshot.get('context')}, not {context}; starting cold")
+			return False
+
+		cold = (tracker.state_dict(), surface_analyzer.state_dict(), segment_analyzer.state_dict())
+
+		try:
+			tracker.load_state_dict(snapshot["tracker"])
+			surface_analyzer.load_state_dict(snapshot["surface"])
+			segment_analyzer.load_state_dict(snapshot["segment"])
+		except (KeyError, TypeError, ValueError, IndexError) as e:
+			# Valid JSON of the wrong shape: undo partial loads, drop the file
+			print(f"StateCheckpointer: discarding malformed checkpoint: {e}")
+			tracker.load_state_dict(cold[0])
+			surface_analyzer.load_state_dict(cold[1])
+			segment_analyzer.load_state_dict(cold[2])
+			try:
+				os.remove(self.path)
+			except OSError:
+				pass
+			return False
+
+		return True
+
+	def maybe_save(self, tracker, surface_analyzer, segment_analyzer, context = None, now = None, force = False):
+		"""
+		Capture a snapshot if interval_s has elapsed (or force) and hand it
+		to the writer (context: run_context() at capture time)
+		"""
+
+		now = time.time() if now is None else now
+		if not force and now - self.last_capture < self.interval_s:
+			return
+
+		self.last_capture = now
+		snapshot = {
+			"version": self.VERSION,
+			"saved_at": now,
+			"context": dict(context) if context is not None else None,
+			"tracker": tracker.state_dict(),
+			"surface": surface_analyzer.state_dict(),
+			"segment": segment_analyzer.state_dict()
+		}
+
+		with self._cond:
+			# Only the newest snapshot matters
+			self._pending = snapshot
+			self._cond.notify()
+
+	def close(self, timeout = 2.0):
+		"""
+		Write any pending snapshot and stop the writer
+		"""
+
+		with self._cond:
+			self._closed = True
+			self._cond.notify()
+		self._worker.join(timeout)
+
+	def _run(self):
+		while True:
+			with self._cond:
+				while self._pending is None and not self._closed:
+					self._cond.wait()
+				snapshot = self._pending
+				self._pending = None
+				closed = self._closed
+
+			if snapshot is not None:
+				self._write(snapshot)
+
+			if closed:
+				return
+
+	def _write(self, snapshot):
+		tmp_path = self.path + ".tmp"
+
+		try:
+			with open(tmp_path, "w") as f:
+				json.dump(snapshot, f, separators = (",", ":"))
+				f.flush()
+				os.fsync(f.fileno())
+			os.replace(tmp_path, self.path)
+			self.writes += 1
+		except OSError:
+			self.write_errors += 1
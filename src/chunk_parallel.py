@@ -0,0 +1,328 @@
+import sys
+import time
+import cv2
+from concurrent.futures import ProcessPoolExecutor
+
+from frame_cache import CachedVideoStream, open_frame_cache
+
+from tracker import Tracker
+from filters import DetectionFilter
+from motion_gate import MotionGate
+from segment_analyzer import SegmentAnalyzer
+from surface_analyzer import SurfaceAnalyzer
+
+
+# Stitching error bound (conditional; compare_timelines is the empirical check):
+# dirty_distance_m is the only SegmentAnalyzer state with long memory. Its
+# update is monotone in the distance and clamped to [0, HARD_CAP], so IF a
+# chunk sees the same per-frame inputs as the sequential run, the sequential
+# value lies between a warm-up started at 0 m and one started at the hard
+# cap. Each chunk runs that upper bracket alongside and reports the gap.
+# The inputs are NOT guaranteed to match: MotionGate (is_static, quiet_count,
+# reference_thumb) and Tracker (track ages, confidence EMAs) carry history
+# too, so a stop spanning the warm-up start or long-lived tracks can make
+# moving / object scores differ, and the bound no longer holds. Treat
+# bound_violations from compare_timelines on real footage as the evidence,
+# not the bound itself.
+FLOAT_TOLERANCE_M = 1e-6
+
+
+class _OfflinePipeline:
+	"""
+	Frame loop of main() without display, driven by the video's nominal fps
+	so runs are deterministic and comparable
+	"""
+
+	def __init__(self, use_detector = True, detector_kwargs = None, profiles = None, bracket = False):
+		self.surface_analyzer = SurfaceAnalyzer(profiles = profiles)
+		self.segment_analyzer = SegmentAnalyzer()
+		self.tracker = Tracker()
+		self.detection_filter = DetectionFilter()
+		self.motion_gate = MotionGate()
+		self.detector = None
+
+		if use_detector:
+			from yolo_detector import YOLODetector
+
+			kwargs = dict(detector_kwargs or {})
+			kwargs.setdefault("road_region", self.surface_analyzer.profiles)
+			self.detector = YOLODetector(**kwargs)
+
+		# Upper bracket for stitching: same inputs, history assumed at the cap
+		self.upper = None
+		if bracket:
+			self.upper = SegmentAnalyzer()
+			self.upper.dirty_distance_m = SegmentAnalyzer.DIRTY_DISTANCE_HARD_CAP
+			self.upper.requires_cleaning = True
+
+		self.tracks = []
+		self.surface_score = 0.0
+
+	def step(self, frame, fps):
+		moving = self.motion_gate.update(frame)
+
+		if moving:
+			if self.detector is not None:
+				detections = self.detector.detect(frame)
+				detections = self.detection_filter.apply(detections, frame.shape)
+				self.tracks = self.tracker.update(detections)
+			self.surface_score = self.surface_analyzer.update(frame)
+
+		state = self.segment_analyzer.update(
+			self.tracks,
+			frame.shape,
+			self.surface_score,
+			fps,
+			moving = moving
+		)
+
+		bound = 0.0
+		if self.upper is not None:
+			upper = self.upper.update(self.tracks, frame.shape, self.surface_score, fps, moving = moving)
+			bound = upper["dirty_distance_m"] - state["dirty_distance_m"]
+			if bound <= FLOAT_TOLERANCE_M and upper["requires_cleaning"] == state["requires_cleaning"]:
+				# Brackets met: history no longer matters
+				self.upper = None
+				bound = 0.0
+
+		return state, bound
+
+
+def video_info(source):
+	cap = cv2.VideoCapture(source)
+	if not cap.isOpened():
+		raise RuntimeError("Cannot open video source")
+	frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+	fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+	cap.release()
+	return frame_count, fps
+
+
+def _seek(cap, source, frame_index):
+	"""
+	Position a VideoCapture exactly on frame_index
+
+	CAP_PROP_POS_FRAMES seeks are not frame-accurate for many codecs; when
+	the reported position disagrees, reopen and grab (decode, no retrieve)
+	up to the target instead. That decodes everything before the chunk
+	(the last chunk decodes the whole file), so with such codecs parallel
+	runs only scale with cache_path.
+	"""
+
+	if frame_index == 0:
+		return cap
+
+	cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+	if int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == frame_index:
+		return cap
+
+	print(f"chunk_parallel: inexact seek in {source}, decoding up to frame {frame_index} (use cache_path)")
+	cap.release()
+	cap = cv2.VideoCapture(source)
+	for _ in range(frame_index):
+		if not cap.grab():
+			break
+	return cap
+
+
+def process_range(
+	source,
+	start_frame,
+	end_frame,
+	warmup_frames = 0,
+	use_detector = True,
+	detector_kwargs = None,
+	cache_path = None
+):
+	"""
+	Run the pipeline on frames [start_frame, end_frame)
+
+	The preceding warmup_frames are processed first to seed Tracker,
+	SurfaceAnalyzer.window and the SegmentAnalyzer state machine; their
+	output is discarded.
+
+	cache_path: read frames from this frame cache (frame_cache.py) instead
+	of decoding; workers then share the decoded frames via the page cache
+
+	Returns:
+		list of (frame_index, dirty_distance_m, requires_cleaning, surface_score,
+		distance_bound_m); distance_bound_m bounds the error against a
+		sequential run caused by the unseen history before the warm-up
+	"""
+
+	first = max(0, start_frame - warmup_frames)
+
+	if cache_path is not None:
+		cap = CachedVideoStream(cache_path)
+		cap.require_full_frames()
+		cap.seek(first)
+		fps = cap.fps
+		profiles = cap.profiles()
+	else:
+		_, fps = video_info(source)
+		cap = cv2.VideoCapture(source)
+		cap = _seek(cap, source, first)
+		profiles = None
+
+	pipeline = _OfflinePipeline(use_detector, detector_kwargs, profiles, bracket = first > 0)
+
+	timeline = []
+	frame_index = first
+
+	try:
+		while frame_index < end_frame:
+			ret, frame = cap.read()
+			if not ret or frame is None:
+				break
+
+			state, bound = pipeline.step(frame, fps)
+
+			if frame_index >= start_frame:
+				timeline.append((
+					frame_index,
+					state["dirty_distance_m"],
+					state["requires_cleaning"],
+					state["surface_score"],
+					bound
+				))
+
+			frame_index += 1
+	finally:
+		cap.release()
+
+	return timeline
+
+
+def process_sequential(source, use_detector = True, detector_kwargs = None, cache_path = None):
+	if cache_path is not None:
+		frame_count = len(open_frame_cache(source, cache_path))
+	else:
+		frame_count, _ = video_info(source)
+	return process_range(source, 0, frame_count, 0, use_detector, detector_kwargs, cache_path)
+
+
+def process_parallel(
+	source,
+	num_workers = 4,
+	chunk_frames = None,
+	warmup_frames = None,
+	use_detector = True,
+	detector_kwargs = None,
+	cache_path = None
+):
+	"""
+	Split one video into time chunks processed in parallel worker processes
+
+	Args:
+		num_workers: worker processes
+		chunk_frames: frames per chunk (default: one chunk per worker)
+		warmup_frames: overlap taken from the preceding chunk (default 60 s)
+		cache_path: frame cache, built once here if missing or stale and
+		            shared by all workers (no per-worker decode). Needed
+		            for speedup on codecs without frame-accurate seeks,
+		            where each chunk otherwise decodes from frame 0
+
+	Returns:
+		stitched timeline, same format as process_range
+	"""
+
+	if cache_path is not None:
+		cache = open_frame_cache(source, cache_path)
+		frame_count, fps = len(cache), cache.fps
+		cache.release()
+	else:
+		frame_count, fps = video_info(source)
+
+	if warmup_frames is None:
+		warmup_frames = int(60 * fps)
+	if chunk_frames is None:
+		chunk_frames = -(-frame_count // num_workers)
+
+	starts = list(range(0, frame_count, chunk_frames))
+
+	with ProcessPoolExecutor(max_workers = num_workers) as pool:
+		futures = [
+			pool.submit(
+				process_range,
+				source,
+				start,
+				min(start + chunk_frames, frame_count),
+				warmup_frames if start > 0 else 0,
+				use_detector,
+				detector_kwargs,
+				cache_path
+			)
+			for start in starts
+		]
+
+		timeline = []
+		for future in futures:
+			timeline.extend(future.result())
+
+	return timeline
+
+
+def compare_timelines(sequential, parallel):
+	"""
+	Check a stitched timeline against the sequential reference
+
+	Returns:
+		dict with max/mean distance error, requires_cleaning agreement and
+		whether every frame is within its derived bound (distance error
+		<= distance_bound_m, identical requires_cleaning where the bound is 0)
+	"""
+
+	reference = {row[0]: row for row in sequential}
+	distance_errors = []
+	agree = 0
+	compared = 0
+	violations = 0
+	bounded_frames = 0
+
+	for frame_index, distance, requires_cleaning, _, bound in parallel:
+		ref = reference.get(frame_index)
+		if ref is None:
+			continue
+
+		compared += 1
+		error = abs(distance - ref[1])
+		distance_errors.append(error)
+		agree += int(requires_cleaning == ref[2])
+
+		if bound > 0.0:
+			bounded_frames += 1
+		if error > bound + FLOAT_TOLERANCE_M or (bound == 0.0 and requires_cleaning != ref[2]):
+			violations += 1
+
+	max_error = max(distance_errors) if distance_errors else 0.0
+	agreement = agree / max(compared, 1)
+
+	return {
+		"frames_compared": compared,
+		"frames_missing": len(sequential) - compared,
+		"max_distance_error_m": max_error,
+		"mean_distance_error_m": sum(distance_errors) / max(len(distance_errors), 1),
+		"cleaning_agreement": agreement,
+		"frames_not_converged": bounded_frames,
+		"bound_violations": violations,
+		"within_tolerance": compared == len(sequential) and violations == 0
+	}
+
+
+if __name__ == "__main__":
+	# python chunk_parallel.py ride.mp4 [workers] [--no-detector] [--cache=cache/ride]
+	path = sys.argv[1] if len(sys.argv) > 1 else "vid3.mp4"
+	workers = int(sys.argv[2]) if len(sys.argv) > 2 and sys.argv[2].isdigit() else 4
+	detect = "--no-detector" not in sys.argv
+	cache = next((arg.split("=", 1)[1] for arg in sys.argv if arg.startswith("--cache=")), None)
+
+	start = time.perf_counter()
+	parallel_timeline = process_parallel(path, num_workers = workers, use_detector = detect, cache_path = cache)
+	parallel_s = time.perf_counter() - start
+
+	start = time.perf_counter()
+	sequential_timeline = process_sequential(path, use_detector = detect, cache_path = cache)
+	sequential_s = time.perf_counter() - start
+
+	print(f"sequential {sequential_s:.1f} s | parallel ({workers} workers) {parallel_s:.1f} s")
+	print(compare_timelines(sequential_timeline, parallel_timeline))
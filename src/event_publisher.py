@@ -0,0 +1,326 @@
+import os
+import json
+import time
+import queue
+import socket
+import threading
+import urllib.request
+
+
+class SegmentEventDetector:
+	"""
+	Turns SegmentAnalyzer state dicts into events
+
+	- "cleaning_required" / "cleaning_cleared" on requires_cleaning transitions
+	- "summary" every summary_interval seconds
+	"""
+
+	def __init__(self, summary_interval = 60.0):
+		self.summary_interval = summary_interval
+		self.last_requires_cleaning = None
+		self._reset_summary(None)
+
+	def _reset_summary(self, timestamp):
+		self.summary_start = timestamp
+		self.summary_frames = 0
+		self.summary_cleaning_frames = 0
+		self.summary_max_distance = 0.0
+		self.summary_surface_total = 0.0
+
+	def update(self, state, timestamp = None):
+		"""
+		Args:
+			state: dict returned by SegmentAnalyzer.update
+			timestamp: seconds (default time.time())
+
+		Returns:
+			list of event dicts (usually empty)
+		"""
+
+		if timestamp is None:
+			timestamp = time.time()
+		if self.summary_start is None:
+			self.summary_start = timestamp
+
+		events = []
+		requires_cleaning = state["requires_cleaning"]
+
+		if self.last_requires_cleaning is not None and requires_cleaning != self.last_requires_cleaning:
+			events.append({
+				"type": "cleaning_required" if requires_cleaning else "cleaning_cleared",
+				"timestamp": timestamp,
+				"dirty_distance_m": state["dirty_distance_m"],
+				"avg_score": state["avg_score"],
+				"surface_score": state["surface_score"]
+			})
+		self.last_requires_cleaning = requires_cleaning
+
+		self.summary_frames += 1
+		self.summary_cleaning_frames += int(requires_cleaning)
+		self.summary_max_distance = max(self.summary_max_distance, state["dirty_distance_m"])
+		self.summary_surface_total += state["surface_score"]
+
+		if timestamp - self.summary_start >= self.summary_interval:
+			events.append({
+				"type": "summary",
+				"timestamp": timestamp,
+				"period_s": timestamp - self.summary_start,
+				"frames": self.summary_frames,
+				"cleaning_fraction": self.summary_cleaning_frames / self.summary_frames,
+				"max_dirty_distance_m": self.summary_max_distance,
+				"mean_surface_score": self.summary_surface_total / self.summary_frames,
+				"requires_cleaning": requires_cleaning
+			})
+			self._reset_summary(timestamp)
+
+		return events
+
+
+class FileSink:
+	"""
+	Appends events as JSON lines to a local file
+	"""
+
+	def __init__(self, path):
+		self.name = "file"
+		self.path = path
+
+	def send(self, batch):
+		with open(self.path, "a") as f:
+			for event in batch:
+				f.write(json.dumps(event) + "\n")
+
+
+class UnixSocketSink:
+	"""
+	Sends newline-delimited JSON over a UNIX stream socket (reconnects on error)
+	"""
+
+	def __init__(self, path, timeout = 2.0):
+		self.name = "unix"
+		self.path = path
+		self.timeout = timeout
+		self.sock = None
+
+	def send(self, batch):
+		payload = "".join(json.dumps(event) + "\n" for event in batch).encode()
+
+		try:
+			if self.sock is None:
+				self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+				self.sock.settimeout(self.timeout)
+				self.sock.connect(self.path)
+			self.sock.sendall(payload)
+		except OSError:
+			if self.sock is not None:
+				self.sock.close()
+				self.sock = None
+			raise
+
+
+class HttpSink:
+	"""
+	POSTs each batch as a JSON array (point url at a local stub for testing)
+	"""
+
+	def __init__(self, url, timeout = 5.0):
+		self.name = "http"
+		self.url = url
+		self.timeout = timeout
+
+	def send(self, batch):
+		request = urllib.request.Request(
+			self.url,
+			data = json.dumps(batch).encode(),
+			headers = {"Content-Type": "application/json"},
+			method = "POST"
+		)
+		with urllib.request.urlopen(request, timeout = self.timeout) as response:
+			if response.status >= 300:
+				raise OSError(f"HTTP {response.status}")
+
+
+class EventPublisher:
+	"""
+	Non-blocking event publishing off the frame loop
+
+	- publish() never blocks: events go into a bounded queue (dropped and
+	  counted if full)
+	- A background worker batches events and flushes them to every sink
+	- Failed sends are retried with backoff, then spooled to disk per sink
+	  and replayed before the next batch once the sink recovers
+	"""
+
+	def __init__(
+		self,
+		sinks,
+		max_queue = 1000,
+		batch_size = 50,
+		flush_interval = 1.0,
+		retries = 3,
+		retry_backoff = 0.5,
+		spool_dir = "event_spool"
+	):
+		self.sinks = sinks
+		self.batch_size = batch_size
+		self.flush_interval = flush_interval
+		self.retries = retries
+		self.retry_backoff = retry_backoff
+		self.spool_dir = spool_dir
+
+		self.queue = queue.Queue(maxsize = max_queue)
+		self.dropped = 0
+		self.sent = 0
+		self.spooled = 0
+		self.corrupt = 0
+		self.flush_errors = 0
+
+		self._stop = object()
+		self._worker = threading.Thread(target = self._run, daemon = True)
+		self._worker.start()
+
+	def publish(self, event):
+		try:
+			self.queue.put_nowait(event)
+		except queue.Full:
+			self.dropped += 1
+
+	def publish_all(self, events):
+		for event in events:
+			self.publish(event)
+
+	def close(self, timeout = 5.0):
+		"""
+		Flush what is queued and stop the worker
+		"""
+
+		try:
+			self.queue.put(self._stop, timeout = timeout)
+		except queue.Full:
+			pass
+		self._worker.join(timeout)
+
+	def _run(self):
+		while True:
+			batch, stopping = self._collect()
+
+			if batch:
+				for sink in self.sinks:
+					try:
+						self._flush(sink, batch)
+					except Exception as e:
+						# Never let one bad flush (disk full, ...) kill the worker
+						self.flush_errors += 1
+						print(f"EventPublisher: flush to {sink.name} failed: {e}")
+
+			if stopping:
+				return
+
+	def _collect(self):
+		"""
+		Block for the first event, then gather up to batch_size for at most
+		flush_interval
+		"""
+
+		first = self.queue.get()
+		if first is self._stop:
+			return [], True
+
+		batch = [first]
+		deadline = time.monotonic() + self.flush_interval
+
+		while len(batch) < self.batch_size:
+			remaining = deadline - time.monotonic()
+			if remaining <= 0:
+				break
+			try:
+				event = self.queue.get(timeout = remaining)
+			except queue.Empty:
+				break
+			if event is self._stop:
+				return batch, True
+			batch.append(event)
+
+		return batch, False
+
+	def _send_with_retry(self, sink, batch):
+		for attempt in range(self.retries):
+			try:
+				sink.send(batch)
+				return True
+			except Exception:
+				time.sleep(self.retry_backoff * (2 ** attempt))
+		return False
+
+	def _spool_path(self, sink):
+		return os.path.join(self.spool_dir, f"{sink.name}.jsonl")
+
+	def _flush(self, sink, batch):
+		spool_path = self._spool_path(sink)
+
+		# Replay older spooled events first to keep ordering
+		if os.path.exists(spool_path):
+			spooled = self._read_spool(spool_path)
+
+			if not spooled:
+				os.remove(spool_path)
+			elif self._send_with_retry(sink, spooled):
+				os.remove(spool_path)
+				self.sent += len(spooled)
+			else:
+				self._spool(spool_path, batch)
+				return
+
+		if self._send_with_retry(sink, batch):
+			self.sent += len(batch)
+		else:
+			self._spool(spool_path, batch)
+
+	def _read_spool(self, spool_path):
+		"""
+		Parse a spool file line by line; lines that do not parse (e.g. the
+		partial last line after a power cut) are moved to <spool>.corrupt and
+		the spool is rewritten with the valid events only
+		"""
+
+		events = []
+		bad_lines = []
+
+		with open(spool_path) as f:
+			for line in f:
+				if not line.strip():
+					continue
+				try:
+					events.append(json.loads(line))
+				except ValueError:
+					bad_lines.append(line if line.endswith("\n") else line + "\n")
+
+		if bad_lines:
+			with open(spool_path + ".corrupt", "a") as f:
+				f.writelines(bad_lines)
+			self.corrupt += len(bad_lines)
+
+			tmp_path = spool_path + ".tmp"
+			with open(tmp_path, "w") as f:
+				for event in events:
+					f.write(json.dumps(event) + "\n")
+			os.replace(tmp_path, spool_path)
+
+		return events
+
+	def _spool(self, spool_path, batch):
+		os.makedirs(self.spool_dir, exist_ok = True)
+
+		# Never append onto a partial last line (power cut mid-write)
+		needs_newline = False
+		if os.path.exists(spool_path) and os.path.getsize(spool_path) > 0:
+			with open(spool_path, "rb") as f:
+				f.seek(-1, os.SEEK_END)
+				needs_newline = f.read(1) != b"\n"
+
+		with open(spool_path, "a") as f:
+			if needs_newline:
+				f.write("\n")
+			for event in batch:
+				f.write(json.dumps(event) + "\n")
+		self.spooled += len(batch)
@@ -0,0 +1,285 @@
+import os
+import sys
+import json
+import cv2
+import numpy as np
+
+from camera_profiles import CameraProfileRegistry
+
+
+def _cache_files(cache_path):
+	return (
+		cache_path + ".frames.npy",
+		cache_path + ".timestamps.npy",
+		cache_path + ".json"
+	)
+
+
+def _source_stamp(source):
+	stat = os.stat(source)
+	return {"source_size": stat.st_size, "source_mtime": stat.st_mtime}
+
+
+def cache_is_fresh(source, cache_path, scale = 1.0, roi_only = False):
+	"""
+	True if the cache exists, was built from this exact source file (same
+	path, size and mtime; a re-recorded file invalidates it) and with the
+	same build parameters
+	"""
+
+	frames_path, timestamps_path, meta_path = _cache_files(cache_path)
+	if not all(os.path.exists(p) for p in (frames_path, timestamps_path, meta_path)):
+		return False
+
+	try:
+		with open(meta_path) as f:
+			meta = json.load(f)
+	except (OSError, ValueError):
+		return False
+
+	stamp = _source_stamp(source)
+	return (
+		meta.get("source") == os.path.abspath(source)
+		and meta.get("source_size") == stamp["source_size"]
+		and meta.get("source_mtime") == stamp["source_mtime"]
+		and meta.get("scale") == scale
+		and meta.get("roi_only") == roi_only
+	)
+
+
+def open_frame_cache(source, cache_path, scale = 1.0, roi_only = False, profiles = None):
+	"""
+	CachedVideoStream over cache_path, (re)built first if missing, stale or
+	built with other parameters (see build_frame_cache)
+	"""
+
+	if not cache_is_fresh(source, cache_path, scale, roi_only):
+		print(f"Building frame cache {cache_path} from {source}")
+		os.makedirs(os.path.dirname(cache_path) or ".", exist_ok = True)
+		build_frame_cache(source, cache_path, scale, roi_only, profiles)
+
+	return CachedVideoStream(cache_path)
+
+
+def _open_frames(path, capacity, height, width):
+	return np.lib.format.open_memmap(
+		path,
+		mode = "w+",
+		dtype = np.uint8,
+		shape = (capacity, height, width, 3)
+	)
+
+
+def _grow_frames(frames, path, count, capacity):
+	"""
+	Copy the first count frames into a larger memory map at path
+	"""
+
+	grown_path = path + ".grow.npy"
+	grown = _open_frames(grown_path, capacity, frames.shape[1], frames.shape[2])
+	grown[:count] = frames[:count]
+	grown.flush()
+
+	del frames
+	os.replace(grown_path, path)
+	return grown
+
+
+def build_frame_cache(source, cache_path, scale = 1.0, roi_only = False, profiles = None):
+	"""
+	Decode a video once into a memory-mapped uint8 frame array
+
+	Args:
+		source: video file
+		cache_path: output prefix (<prefix>.frames.npy, .timestamps.npy, .json)
+		scale: working resolution factor applied after decode (1.0 = native)
+		roi_only: store only the road-polygon bounding crop of each frame
+		profiles: CameraProfileRegistry for roi_only (default: loaded config)
+
+	Returns:
+		metadata dict (also written to <prefix>.json)
+	"""
+
+	frames_path, timestamps_path, meta_path = _cache_files(cache_path)
+
+	cap = cv2.VideoCapture(source)
+	if not cap.isOpened():
+		raise RuntimeError("Cannot open video source")
+
+	# CAP_PROP_FRAME_COUNT is a container estimate: used as the initial
+	# capacity only, the cache grows if the video turns out longer
+	capacity = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+	if capacity <= 0:
+		cap.release()
+		raise RuntimeError(f"Frame count unavailable for {source} (got {capacity})")
+	fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+	src_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+	src_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+	bbox = (0, 0, src_w, src_h)
+	polygon = None
+	if roi_only:
+		profiles = profiles or CameraProfileRegistry.load()
+		bbox = profiles.geometry((src_h, src_w)).bbox
+		polygon = profiles.profiles[profiles.active]["polygon"]
+
+	x1, y1, x2, y2 = bbox
+	out_w = max(1, int((x2 - x1) * scale))
+	out_h = max(1, int((y2 - y1) * scale))
+
+	# Written under temporary names, renamed once complete
+	tmp_frames = frames_path + ".tmp.npy"
+	frames = _open_frames(tmp_frames, capacity, out_h, out_w)
+	timestamps = np.zeros(capacity, dtype = np.float64)
+
+	count = 0
+	try:
+		while True:
+			ret, frame = cap.read()
+			if not ret or frame is None:
+				break
+
+			if count == capacity:
+				# Estimate was low: grow by half, never truncate the ride
+				capacity = capacity + max(capacity // 2, 1)
+				frames = _grow_frames(frames, tmp_frames, count, capacity)
+				timestamps = np.concatenate([timestamps, np.zeros(capacity - len(timestamps))])
+
+			timestamps[count] = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+			crop = frame[y1:y2, x1:x2]
+
+			if (out_w, out_h) == (crop.shape[1], crop.shape[0]):
+				frames[count] = crop
+			else:
+				cv2.resize(crop, (out_w, out_h), dst = frames[count], interpolation = cv2.INTER_AREA)
+
+			count += 1
+	finally:
+		cap.release()
+		frames.flush()
+		del frames
+
+	np.save(timestamps_path, timestamps[:count])
+	os.replace(tmp_frames, frames_path)
+
+	meta = {
+		"source": os.path.abspath(source),
+		**_source_stamp(source),
+		"frame_count": count,
+		"capacity": capacity,
+		"fps": fps,
+		"frame_shape": [out_h, out_w, 3],
+		"source_shape": [src_h, src_w, 3],
+		"scale": scale,
+		"roi_only": roi_only,
+		"roi_bbox": list(bbox),
+		"roi_polygon": polygon
+	}
+
+	with open(meta_path, "w") as f:
+		json.dump(meta, f, indent = 2)
+
+	return meta
+
+
+class CachedVideoStream:
+	"""
+	VideoStream-compatible reader over a frame cache
+
+	- read() / read_chunk() return read-only views of the memory map
+	  (zero-copy; pages shared between processes via the page cache)
+	- Random access with seek() / frame(i) / timestamp(i)
+	"""
+
+	# read() views are read-only and must not be copied by consumers
+	zero_copy = True
+
+	def __init__(self, cache_path, start_frame = 0):
+		frames_path, timestamps_path, meta_path = _cache_files(cache_path)
+
+		with open(meta_path) as f:
+			self.meta = json.load(f)
+
+		self.frames = np.load(frames_path, mmap_mode = "r")[:self.meta["frame_count"]]
+		self.timestamps = np.load(timestamps_path)
+		self.fps = self.meta["fps"]
+		self.position = start_frame
+
+	def __len__(self):
+		return len(self.frames)
+
+	def read(self, frame = None):
+		"""
+		frame: accepted for VideoStream compatibility; if given the cached
+		frame is copied into it, otherwise a zero-copy view is returned
+		"""
+		if self.position >= len(self.frames):
+			return False, None
+
+		view = self.frames[self.position]
+		self.position += 1
+
+		if frame is not None:
+			np.copyto(frame, view)
+			return True, frame
+		return True, view
+
+	def read_chunk(self, count, out = None):
+		chunk = self.frames[self.position:self.position + count]
+		self.position += len(chunk)
+
+		if out is not None:
+			np.copyto(out[:len(chunk)], chunk)
+			return out[:len(chunk)]
+		return chunk
+
+	def seek(self, index):
+		self.position = max(0, min(index, len(self.frames)))
+
+	def frame(self, index):
+		return self.frames[index]
+
+	def timestamp(self, index):
+		return float(self.timestamps[index])
+
+	def frame_shape(self):
+		return tuple(self.meta["frame_shape"])
+
+	def profiles(self):
+		"""
+		Camera profiles valid for the cached frames
+
+		ROI-only caches get a single profile with the road polygon
+		re-expressed relative to the stored crop.
+		"""
+		if not self.meta["roi_only"]:
+			return CameraProfileRegistry.load()
+
+		src_h, src_w, _ = self.meta["source_shape"]
+		x1, y1, x2, y2 = self.meta["roi_bbox"]
+		polygon = [
+			[(x * src_w - x1) / max(x2 - x1, 1), (y * src_h - y1) / max(y2 - y1, 1)]
+			for x, y in self.meta["roi_polygon"]
+		]
+		return CameraProfileRegistry({"cached_roi": {"polygon": polygon}}, "cached_roi")
+
+	def require_full_frames(self):
+		"""
+		Raise for ROI-only caches: DetectionFilter / SegmentAnalyzer position
+		and area rules are relative to the whole frame, not the road crop
+		"""
+		if self.meta["roi_only"]:
+			raise ValueError("ROI-only frame caches cannot feed the full pipeline; rebuild without roi_only")
+
+	def release(self):
+		self.frames = None
+
+
+if __name__ == "__main__":
+	# python frame_cache.py ride.mp4 cache/ride [scale] [--roi-only]
+	source = sys.argv[1]
+	prefix = sys.argv[2]
+	factor = float(sys.argv[3]) if len(sys.argv) > 3 and not sys.argv[3].startswith("--") else 1.0
+
+	os.makedirs(os.path.dirname(prefix) or ".", exist_ok = True)
+	print(build_frame_cache(source, prefix, scale = factor, roi_only = "--roi-only" in sys.argv))
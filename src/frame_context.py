@@ -0,0 +1,114 @@
+import cv2
+import numpy as np
+
+
+class FrameContext:
+    """
+    Per-frame cache of derived views shared by the image stages (motion
+    gate, surface analyzer, ROI debug view). The detector letterboxes its
+    own crops and the filter / segment stages only need frame.shape.
+
+    - Views (ROI crop, ROI gray / HSV, thumbnails, ROI stats) are computed on
+      first use and memoized until the next reset(), so each conversion
+      happens at most once per frame
+    - reset() recycles the context for the next frame: memo cleared, output
+      buffers kept and refilled via dst= (no per-frame allocation)
+    - Views are only valid until the next reset(); stages that keep data
+      across frames must copy it
+
+    Usage:
+        ctx = FrameContext(surface_analyzer.profiles)
+        while ...:
+            ctx.reset(frame)
+            surface_analyzer.update(frame, ctx)
+            debug_viz.visualize(frame, surface_analyzer, score, ctx=ctx)
+    """
+
+    def __init__(self, profiles):
+        """
+        Args:
+            profiles: CameraProfileRegistry (shared ROI geometry)
+        """
+        self.profiles = profiles
+        self.frame = None
+        self.index = -1
+        self._views = {}
+        self._buffers = {}
+
+    def reset(self, frame):
+        self.frame = frame
+        self.index += 1
+        self._views.clear()
+        return self
+
+    @property
+    def shape(self):
+        return self.frame.shape
+
+    def _buffer(self, key, shape):
+        buf = self._buffers.get(key)
+        if buf is None or buf.shape != shape:
+            buf = np.empty(shape, dtype=np.uint8)
+            self._buffers[key] = buf
+        return buf
+
+    def _memo(self, key, build):
+        view = self._views.get(key)
+        if view is None:
+            view = build()
+            self._views[key] = view
+        return view
+
+    def geometry(self):
+        """
+        Active road geometry for this frame size.
+        """
+        return self._memo("geometry", lambda: self.profiles.geometry(self.frame.shape))
+
+    def roi(self):
+        """
+        ROI bounding crop (view into the frame).
+        """
+        return self._memo("roi", lambda: self.geometry().crop(self.frame))
+
+    def roi_gray(self):
+        def build():
+            roi = self.roi()
+            dst = self._buffer("roi_gray", roi.shape[:2])
+            return cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY, dst=dst)
+        return self._memo("roi_gray", build)
+
+    def roi_hsv(self):
+        def build():
+            roi = self.roi()
+            dst = self._buffer("roi_hsv", roi.shape)
+            return cv2.cvtColor(roi, cv2.COLOR_BGR2HSV, dst=dst)
+        return self._memo("roi_hsv", build)
+
+    def roi_stats(self):
+        """
+        (mean, std) of the ROI gray inside the road mask.
+        """
+        def build():
+            mean, std = cv2.meanStdDev(self.roi_gray(), mask=self.geometry().mask)
+            return float(mean[0, 0]), float(std[0, 0])
+        return self._memo("roi_stats", build)
+
+    def downscaled(self, size):
+        """
+        Whole frame resized to size (W, H).
+        """
+        def build():
+            dst = self._buffer(("downscaled", size), (size[1], size[0], 3))
+            return cv2.resize(self.frame, size, dst=dst, interpolation=cv2.INTER_AREA)
+        return self._memo(("downscaled", size), build)
+
+    def thumbnail(self, size):
+        """
+        Grayscale frame at size (W, H), resized before conversion (cheap).
+        """
+        def build():
+            small = self.downscaled(size)
+            dst = self._buffer(("thumbnail", size), (size[1], size[0]))
+            return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=dst)
+        return self._memo(("thumbnail", size), build)
@@ -0,0 +1,83 @@
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+
+
+class FrameRing:
+	"""
+	Fixed-size frame slots in a single shared memory block
+
+	- Producers write straight into a free slot (no pickling of frames)
+	- Only the slot index and small metadata travel over queues
+	- Consumers hand the index back to the free queue once done with it
+	"""
+
+	def __init__(self, num_slots, frame_shape, name = None, create = True):
+		"""
+		num_slots:
+			Ring depth, also bounds how many frames are in flight
+
+		frame_shape:
+			(H, W, C) of a uint8 frame
+
+		name:
+			Existing block to attach to (create = False)
+		"""
+
+		self.num_slots = num_slots
+		self.frame_shape = tuple(frame_shape)
+		self.owner = create
+
+		slot_bytes = int(np.prod(self.frame_shape))
+
+		if create:
+			self.shm = shared_memory.SharedMemory(create = True, size = slot_bytes * num_slots)
+		else:
+			self.shm = self._attach(name)
+
+		self.frames = np.ndarray(
+			(num_slots,) + self.frame_shape,
+			dtype = np.uint8,
+			buffer = self.shm.buf
+		)
+
+	@staticmethod
+	def _attach(name):
+		# Only the creating process may unlink; keep the tracker from doing it
+		# when an attached worker exits
+		try:
+			return shared_memory.SharedMemory(name = name, track = False)
+		except TypeError:
+			shm = shared_memory.SharedMemory(name = name)
+			resource_tracker.unregister(shm._name, "shared_memory")
+			return shm
+
+	def spec(self):
+		"""
+		Picklable description used to attach from another process
+		"""
+
+		return (self.shm.name, self.num_slots, self.frame_shape)
+
+	@classmethod
+	def attach(cls, spec):
+		name, num_slots, frame_shape = spec
+		return cls(num_slots, frame_shape, name = name, create = False)
+
+	def slot(self, index):
+		"""
+		Zero-copy (H, W, C) view of one slot
+		"""
+
+		return self.frames[index]
+
+	def close(self):
+		self.frames = None
+
+		try:
+			self.shm.close()
+		except BufferError:
+			# A caller still holds a slot view; released at process exit
+			pass
+
+		if self.owner:
+			self.shm.unlink()
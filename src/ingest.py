@@ -0,0 +1,122 @@
+import cv2
+import numpy as np
+
+
+class FrameTransform:
+	"""
+	Pixel mapping between the working frame and the native camera frame
+
+	Analysis runs in working coordinates; boxes are mapped to native only
+	for output and overlays (ROI polygons are ratio-based and are simply
+	rebuilt for the native shape).
+	"""
+
+	def __init__(self, native_shape, work_shape):
+		self.native_shape = tuple(native_shape)
+		self.work_shape = tuple(work_shape)
+
+		self.scale_x = native_shape[1] / work_shape[1]
+		self.scale_y = native_shape[0] / work_shape[0]
+
+	@property
+	def identity(self):
+		return self.native_shape[:2] == self.work_shape[:2]
+
+	def to_native_bbox(self, bbox):
+		if self.identity:
+			return list(bbox)
+
+		x1, y1, x2, y2 = bbox
+		h, w = self.native_shape[:2]
+
+		return [
+			max(0, min(int(round(x1 * self.scale_x)), w - 1)),
+			max(0, min(int(round(y1 * self.scale_y)), h - 1)),
+			max(0, min(int(round(x2 * self.scale_x)), w - 1)),
+			max(0, min(int(round(y2 * self.scale_y)), h - 1))
+		]
+
+
+class WorkingResolutionIngest:
+	"""
+	Single ingest stage that delivers every frame at one working resolution
+
+	- Asks the capture backend for the working size first (cameras), so no
+	  resize is needed; otherwise resizes once per frame into a reused buffer
+	- Never upscales; aspect ratio is kept so ratio-based ROIs and filters
+	  mean the same thing in both frames
+	- With a fixed work_width, pixel-scale measures (texture features, tile
+	  size) see the same scale for every camera and 4K footage costs about
+	  the same per frame as 720p. The surface / segment thresholds were tuned
+	  on native frames, so pick work_width only after recalibrating at it
+	"""
+
+	def __init__(self, video_stream, work_width = None, request_from_backend = True):
+		"""
+		video_stream:
+			VideoStream (or CachedVideoStream) providing read(frame) / frame_shape()
+
+		work_width:
+			Working frame width in pixels (None = native resolution)
+
+		request_from_backend:
+			Try CAP_PROP_FRAME_WIDTH / HEIGHT on the capture first
+		"""
+
+		self.video_stream = video_stream
+
+		native_shape = video_stream.frame_shape()
+		work_shape = self._work_shape(native_shape, work_width)
+
+		if request_from_backend and work_shape != native_shape and hasattr(video_stream, "cap"):
+			# Files ignore this; cameras that honour it deliver working frames
+			video_stream.cap.set(cv2.CAP_PROP_FRAME_WIDTH, work_shape[1])
+			video_stream.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, work_shape[0])
+			native_shape = video_stream.frame_shape()
+			work_shape = self._work_shape(native_shape, work_width)
+
+		self.transform = FrameTransform(native_shape, work_shape)
+
+		# Zero-copy sources (frame cache) hand out views; no decode buffer
+		self._zero_copy = getattr(video_stream, "zero_copy", False)
+		self._native = None if self._zero_copy else np.empty(native_shape, dtype = np.uint8)
+		self._work = None if self.transform.identity else np.empty(work_shape, dtype = np.uint8)
+
+	@staticmethod
+	def _work_shape(native_shape, work_width):
+		height, width = native_shape[:2]
+		if work_width is None or work_width >= width:
+			return tuple(native_shape)
+
+		work_height = max(2, int(round(height * work_width / width / 2)) * 2)
+		return (work_height, work_width, 3)
+
+	def frame_shape(self):
+		return self.transform.work_shape
+
+	def read(self):
+		"""
+		Returns:
+			(ret, work_frame, native_frame); both are reused buffers (or
+			read-only cache views), valid until the next read(). They are the
+			same array when no resize is needed.
+		"""
+
+		ret, native = self.video_stream.read(self._native)
+		if not ret or native is None:
+			return False, None, None
+
+		if self._work is None:
+			return True, native, native
+
+		work = cv2.resize(
+			native,
+			(self._work.shape[1], self._work.shape[0]),
+			dst = self._work,
+			interpolation = cv2.INTER_AREA
+		)
+
+		return True, work, native
+
+	def release(self):
+		self.video_stream.release()
@@ -1,7 +1,12 @@
-import cv2
 import time 
+_PROCESS_START = time.perf_counter()
+
+import cv2
+from contextlib import ExitStack, nullcontext
 
 from video_stream import VideoStream 
+from ingest import WorkingResolutionIngest
+from frame_cache import open_frame_cache
 from yolo_detector import YOLODetector 
 from tracker import Tracker
 from filters import DetectionFilter
@@ -9,62 +14,284 @@ from segment_analyzer import SegmentAnalyzer
 from surface_analyzer import SurfaceAnalyzer
 from roi_debug_visualizer import ROIDebugVisualizer
 from visualizer import Visualizer
+from motion_gate import MotionGate
+from multiprocess_pipeline import run_multiprocess
+from memory_tracer import MemoryTracer
+from quality_controller import QualityController, QUALITY_LEVELS
+from event_publisher import EventPublisher, SegmentEventDetector
+from span_tracer import TRACER
+from frame_context import FrameContext
+from cascade import CascadeController
+from checkpoint import StateCheckpointer
+
+
+def report_startup(phases, detector):
+	"""
+	Print cold-start phase timings (seconds) once the first frame is analyzed
+	"""
+
+	print("Startup phases:")
+	for name, seconds in phases:
+		print(f"  {name:<20} {seconds:6.3f} s")
+	for name, seconds in detector.load_timings.items():
+		print(f"  detector.{name:<11} {seconds:6.3f} s")
+
+
+def stage(name, profilers):
+	"""
+	Enter name on every active profiler (memory tracer, quality controller,
+	span tracer); no-op when none is active
+	"""
+
+	if not profilers:
+		return nullcontext()
+	if len(profilers) == 1:
+		return profilers[0].stage(name)
+
+	stack = ExitStack()
+	for profiler in profilers:
+		stack.enter_context(profiler.stage(name))
+	return stack
+
+
+def main(
+	source = "vid3.mp4",
+	cache_path = None,
+	multiprocess = False,
+	trace_memory = False,
+	target_fps = 15.0,
+	event_sinks = None,
+	trace_spans = False,
+	trace_spike_ms = 200.0,
+	cascade = False,
+	checkpoint_path = "pipeline_state.json",
+	work_width = None
+):
+	if multiprocess:
+		# Decode / detect / analysis on separate cores, frames via shared memory
+		run_multiprocess(
+			source,
+			detector_kwargs = {
+				"model_path": "yolov8n.pt",
+				"img_size": 640,
+				"conf_threshold": 0.25
+			}
+		)
+		return
+
+	phases = [("imports", time.perf_counter() - _PROCESS_START)]
+	phase_start = time.perf_counter()
+
+	# Repeated runs on the same footage: decoded frames from a memory-mapped
+	# cache (built on first use, rebuilt when the source file changes)
+	cached_stream = None
+	if cache_path is not None:
+		cached_stream = open_frame_cache(source, cache_path)
+		cached_stream.require_full_frames()
 
+	surface_analyzer = SurfaceAnalyzer(
+		profiles = cached_stream.profiles() if cached_stream is not None else None
+	)
 
-def main():
-	video_stream = VideoStream()
+	# Litter can only matter on the road, so skip sky and verges at inference.
+	# Model import/load/warmup runs in the background while the source opens.
 	detector = YOLODetector(
 		model_path = "yolov8n.pt",
 		img_size = 640,
-		conf_threshold = 0.25
+		conf_threshold = 0.25,
+		road_region = surface_analyzer.profiles,
+		compiled_format = "torchscript",
+		background_load = True,
+		lean = True,
+		img_sizes = [level["detector_img_size"] for level in QUALITY_LEVELS]
 	)
 
+	# Everything below runs on one working resolution; native frames are
+	# only used for display (boxes mapped back via ingest.transform)
+	video_stream = cached_stream if cached_stream is not None else VideoStream(source)
+	ingest = WorkingResolutionIngest(video_stream, work_width = work_width)
+	phases.append(("open_source", time.perf_counter() - phase_start))
+	phase_start = time.perf_counter()
+
 	tracker = Tracker()
 	detection_filter = DetectionFilter()
 	segment_analyzer = SegmentAnalyzer()
-	surface_analyzer = SurfaceAnalyzer()
-	visualizer = Visualizer()
-	debug_viz = ROIDebugVisualizer()
+	visualizer = Visualizer(profiles = surface_analyzer.profiles)
+	debug_viz = ROIDebugVisualizer(profiles = surface_analyzer.profiles)
+	motion_gate = MotionGate()
+
+	# Derived views (ROI crop, gray, HSV, thumbnails) computed once per frame
+	ctx = FrameContext(surface_analyzer.profiles)
+	mem_tracer = MemoryTracer(enabled = trace_memory)
+
+	# Steps detector size, detection cadence and overlay
+	# to hold target_fps as the device heats up and throttles
+	controller = QualityController(target_fps = target_fps) if target_fps else None
+
+	# Cleaning transitions / summaries to dispatch, flushed off the frame loop
+	event_detector = SegmentEventDetector()
+
+	# Surface-first: YOLO only near thresholds / hysteresis edges / on schedule
+	cascade_controller = CascadeController(segment_analyzer) if cascade else None
+
+	# Warm restore after a crash / power cycle instead of re-converging
+	checkpointer = None
+	if checkpoint_path:
+		checkpointer = StateCheckpointer(checkpoint_path)
+		run_context = StateCheckpointer.run_context(
+			source, ingest.frame_shape(), surface_analyzer.profiles.active
+		)
+		if checkpointer.restore(tracker, surface_analyzer, segment_analyzer, run_context):
+			print(f"Restored pipeline state from {checkpoint_path}")
+	publisher = EventPublisher(event_sinks) if event_sinks else None
+
+	# Span trace ring buffer: 't' dumps it, frames over trace_spike_ms auto-dump
+	if trace_spans:
+		TRACER.enable(spike_ms = trace_spike_ms)
+
+	profilers = [
+		p for p, active in ((mem_tracer, trace_memory), (controller, controller is not None), (TRACER, trace_spans))
+		if active
+	]
+
+	tracks = []
+	surface_score = 0.0
+
+	phases.append(("init_stages", time.perf_counter() - phase_start))
+	phase_start = time.perf_counter()
+	first_frame = True
 
 	prev_time = time.time()
 
 	while True:
-		ret, frame = video_stream.read()
+		if controller is not None:
+			controller.begin_frame()
+		TRACER.begin_frame()
+
+		with stage("decode", profilers):
+			ret, frame, native_frame = ingest.read()
 		if not ret or frame is None:
 			break
 
+		ctx.reset(frame)
+
 		current_time = time.time()
 		fps = 1.0 / max(current_time - prev_time, 1e-6)
 		prev_time = current_time
 		
-		detections = detector.detect(frame)
-		detections = detection_filter.apply(detections, frame.shape)
-		tracks = tracker.update(detections)
-		surface_score = surface_analyzer.update(frame)
-		segment_state = segment_analyzer.update(
-			tracks,
-			frame.shape,
-			surface_score,
-			fps
-		)
+		# Stationary (e.g. at lights): reuse last results, freeze distance
+		with stage("motion", profilers):
+			moving = motion_gate.update(frame, ctx)
+
+		if moving:
+			with stage("surface", profilers):
+				surface_score = surface_analyzer.update(frame, ctx)
+
+		# Cadence knob / cascade: frames without detection hold the last
+		# object score in SegmentAnalyzer (tracks = None)
+		run_detection = moving
+		if controller is not None:
+			run_detection = controller.should_detect() and run_detection
+		if cascade_controller is not None:
+			# Called every frame so its schedule and statistics stay correct
+			run_detection = cascade_controller.should_detect(surface_score, allowed = run_detection)
+
+		if run_detection:
+			with stage("detect", profilers):
+				detections = detector.detect(frame)
+			with stage("filter", profilers):
+				detections = detection_filter.apply(detections, frame.shape)
+			with stage("track", profilers):
+				tracks = tracker.update(detections)
+
+		with stage("segment", profilers):
+			segment_state = segment_analyzer.update(
+				tracks if run_detection else None,
+				frame.shape,
+				surface_score,
+				fps,
+				moving = moving
+			)
+
+		if publisher is not None:
+			publisher.publish_all(event_detector.update(segment_state))
+
+		if checkpointer is not None:
+			# Profile can be switched at runtime ('p')
+			run_context["profile"] = surface_analyzer.profiles.active
+			checkpointer.maybe_save(tracker, surface_analyzer, segment_analyzer, run_context)
+
+		if first_frame:
+			# First frame absorbs any remaining model load / warmup wait
+			phases.append(("first_frame", time.perf_counter() - phase_start))
+			phases.append(("total_to_first", time.perf_counter() - _PROCESS_START))
+			report_startup(phases, detector)
+			first_frame = False
 
 		current_time = time.time()
 		fps = 1.0 / (current_time - prev_time)
 		prev_time = current_time
 
-		debug_frame = debug_viz.visualize(
-			frame,
-			surface_analyzer,
-			segment_state["surface_score"]
-		)
+		overlay = "full" if controller is None else controller.operating_point()["overlay"]
+
+		with stage("visualize", profilers):
+			if overlay == "full":
+				debug_frame = debug_viz.visualize(
+					native_frame,
+					surface_analyzer,
+					segment_state["surface_score"],
+					ctx = ctx
+				)
+				debug_frame = visualizer.draw_detections(debug_frame, tracks, ingest.transform)
+			elif overlay == "minimal":
+				# Cache frames are read-only views; draw on a copy then
+				banner_frame = native_frame if native_frame.flags.writeable else native_frame.copy()
+				debug_frame = visualizer.draw_banner(banner_frame, segment_state["requires_cleaning"])
+			else:
+				debug_frame = native_frame
+
+		with stage("display", profilers):
+			cv2.imshow("Demo", debug_frame)
+			key = cv2.waitKey(1) & 0xFF
+
+		mem_tracer.end_frame()
+
+		spike_dump = TRACER.end_frame()
+		if spike_dump is not None:
+			print(f"Latency spike, writing trace: {spike_dump}")
 
-		cv2.imshow("Demo", debug_frame)
+		if controller is not None:
+			if controller.end_frame():
+				controller.apply(detector)
+				print(f"Quality level -> {controller.operating_point()}")
 
-		if cv2.waitKey(1) & 0xFF == 27:
+			# Frames up to the first detection include model load / warmup
+			if run_detection and not controller.warm:
+				controller.mark_warm()
+
+		if key == ord('t') and trace_spans:
+			print(f"Writing trace: {TRACER.dump(background = True)}")
+
+		# ESC quits, 'p' switches camera profile (see ROIDebugVisualizer)
+		if not debug_viz.handle_keypress(key, debug_frame):
 			break
 
-	video_stream.release()
+	ingest.release()
 	cv2.destroyAllWindows()
 
+	if publisher is not None:
+		publisher.close()
+
+	# Let queued trace dumps finish writing
+	TRACER.close()
+
+	if checkpointer is not None:
+		run_context["profile"] = surface_analyzer.profiles.active
+		checkpointer.maybe_save(tracker, surface_analyzer, segment_analyzer, run_context, force = True)
+		checkpointer.close()
+
+	if cascade_controller is not None:
+		print(f"Cascade: {cascade_controller.get_diagnostics()}")
+
 if __name__ == "__main__":
 	main()
\ No newline at end of file
@@ -0,0 +1,79 @@
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+
+class MemoryTracer:
+	"""
+	Per-frame, per-stage allocation tracing (tracemalloc)
+
+	- peak: transient bytes allocated on top of what existed at stage start
+	- retained: bytes still alive when the stage ends
+	NumPy and OpenCV output arrays are tracked since both go through NumPy's
+	allocator. Disabled tracer is a no-op.
+	"""
+
+	def __init__(self, enabled = False, report_every = 100):
+		"""
+		enabled:
+			Start tracemalloc and record stages
+
+		report_every:
+			Print averaged per-stage numbers every N frames (0 = never)
+		"""
+
+		self.enabled = enabled
+		self.report_every = report_every
+		self.frame_count = 0
+		self.totals = {}
+		self._null = nullcontext()
+
+		if self.enabled and not tracemalloc.is_tracing():
+			tracemalloc.start()
+
+	def stage(self, name):
+		if not self.enabled:
+			return self._null
+		return self._trace(name)
+
+	@contextmanager
+	def _trace(self, name):
+		start, _ = tracemalloc.get_traced_memory()
+		tracemalloc.reset_peak()
+
+		try:
+			yield
+		finally:
+			current, peak = tracemalloc.get_traced_memory()
+			total = self.totals.setdefault(name, [0, 0])
+			total[0] += max(0, peak - start)
+			total[1] += current - start
+
+	def end_frame(self):
+		if not self.enabled:
+			return
+
+		self.frame_count += 1
+		if self.report_every and self.frame_count % self.report_every == 0:
+			self.report()
+
+	def summary(self):
+		"""
+		Returns {stage: {"peak_bytes": avg, "retained_bytes": avg}} per frame
+		"""
+
+		frames = max(self.frame_count, 1)
+		return {
+			name: {
+				"peak_bytes": peak / frames,
+				"retained_bytes": retained / frames
+			}
+			for name, (peak, retained) in self.totals.items()
+		}
+
+	def report(self):
+		print(f"Allocations per frame (avg over {self.frame_count} frames):")
+		for name, stats in self.summary().items():
+			print(
+				f"  {name:<12} peak {stats['peak_bytes'] / 1024:9.1f} KiB"
+				f" | retained {stats['retained_bytes'] / 1024:8.1f} KiB"
+			)
@@ -0,0 +1,181 @@
+import sys
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+	"""
+	Cheap ego-motion gate on a tiny grayscale thumbnail
+
+	- Declares the scene static after a run of low-motion frames
+	- Wakes on the first frame with motion (no run needed)
+	- Uses a high percentile over pixels, not the median: low-texture asphalt
+	  and sky barely change while riding, so the median of a ride frame can
+	  sit at noise level. Traffic crossing a stopped bike only wakes the gate
+	  once it covers more than (100 - percentile)% of the thumbnail
+	"""
+
+	def __init__(
+		self,
+		method = "diff",
+		thumb_size = (64, 36),
+		percentile = 90,
+		static_threshold = 4.0,
+		wake_threshold = 8.0,
+		static_frames = 15
+	):
+		"""
+		method:
+			"diff" (abs frame difference, gray levels) |
+			"flow" (Farneback flow magnitude, thumbnail pixels)
+
+		percentile:
+			Pixel percentile of the difference / flow used as the motion value
+
+		thumb_size:
+			(W, H) of the downsampled frame
+
+		static_threshold:
+			Motion below this counts towards going static
+
+		wake_threshold:
+			Motion above this wakes immediately (kept above static_threshold
+			for hysteresis)
+
+		static_frames:
+			Consecutive quiet frames needed before idling
+		"""
+
+		if method not in ("diff", "flow"):
+			raise ValueError(f"Unknown motion method: {method}")
+
+		self.method = method
+		self.thumb_size = thumb_size
+		self.percentile = percentile
+		self.static_threshold = static_threshold
+		self.wake_threshold = wake_threshold
+		self.static_frames = static_frames
+
+		self.prev_thumb = None
+		self.reference_thumb = None
+		self.quiet_count = 0
+		self.is_static = False
+		self.last_motion = 0.0
+
+		# Diagnostics
+		self.total_frames = 0
+		self.static_frame_count = 0
+
+	def _thumbnail(self, frame, ctx = None):
+		if ctx is not None:
+			# Shared per-frame view; copied since the context is recycled
+			return ctx.thumbnail(self.thumb_size).copy()
+
+		gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+		return cv2.resize(gray, self.thumb_size, interpolation = cv2.INTER_AREA)
+
+	def _motion(self, prev, curr):
+		if self.method == "flow":
+			flow = cv2.calcOpticalFlowFarneback(prev, curr, None, 0.5, 2, 9, 2, 5, 1.1, 0)
+			magnitude = cv2.magnitude(flow[..., 0], flow[..., 1])
+			return float(np.percentile(magnitude, self.percentile))
+
+		return float(np.percentile(cv2.absdiff(prev, curr), self.percentile))
+
+	def update(self, frame, ctx = None):
+		"""
+		Args:
+			frame: BGR image (numpy array)
+			ctx: optional FrameContext (thumbnail shared with other stages)
+
+		Returns:
+			bool: True if the vehicle is moving and the frame should be analyzed
+		"""
+
+		self.total_frames += 1
+		thumb = self._thumbnail(frame, ctx)
+
+		if self.prev_thumb is None:
+			self.prev_thumb = thumb
+			return True
+
+		if self.is_static:
+			# Compare against the frame we stopped on so slow creeping still wakes
+			self.last_motion = self._motion(self.reference_thumb, thumb)
+
+			if self.last_motion > self.wake_threshold:
+				self.is_static = False
+				self.quiet_count = 0
+				self.reference_thumb = None
+		else:
+			self.last_motion = self._motion(self.prev_thumb, thumb)
+
+			if self.last_motion < self.static_threshold:
+				self.quiet_count += 1
+			else:
+				self.quiet_count = 0
+
+			if self.quiet_count >= self.static_frames:
+				self.is_static = True
+				self.reference_thumb = thumb
+
+		self.prev_thumb = thumb
+
+		if self.is_static:
+			self.static_frame_count += 1
+
+		return not self.is_static
+
+	def get_diagnostics(self):
+		"""
+		Return diagnostic info for tuning and debugging.
+		"""
+
+		static_rate = (self.static_frame_count / max(self.total_frames, 1)) * 100
+		return {
+			"method": self.method,
+			"is_static": self.is_static,
+			"last_motion": self.last_motion,
+			"static_rate": f"{static_rate:.1f}%",
+			"total_frames": self.total_frames
+		}
+
+
+def static_report(source, max_frames = None, **gate_kwargs):
+	"""
+	Run the gate over a video and summarise its decisions
+
+	On ride footage with no stops, static_rate should be 0%; motion
+	quantiles show how far riding frames sit above static_threshold.
+	"""
+
+	gate = MotionGate(**gate_kwargs)
+	cap = cv2.VideoCapture(source)
+	motions = []
+
+	while max_frames is None or gate.total_frames < max_frames:
+		ret, frame = cap.read()
+		if not ret:
+			break
+		gate.update(frame)
+		if gate.total_frames > 1:
+			motions.append(gate.last_motion)
+	cap.release()
+
+	report = gate.get_diagnostics()
+	if motions:
+		report["motion_p5"], report["motion_p50"], report["motion_p95"] = (
+			float(v) for v in np.percentile(motions, [5, 50, 95])
+		)
+		report["below_static_threshold"] = f"{np.mean(np.array(motions) < gate.static_threshold) * 100:.1f}%"
+	return report
+
+
+if __name__ == "__main__":
+	# python motion_gate.py ride.mp4 [diff|flow]
+	source = sys.argv[1]
+	method = sys.argv[2] if len(sys.argv) > 2 else "diff"
+
+	for name, value in static_report(source, method = method).items():
+		print(f"{name}: {value}")
@@ -0,0 +1,218 @@
+import cv2
+import time
+import queue
+import multiprocessing as mp
+
+from frame_ring import FrameRing
+from video_stream import VideoStream
+from motion_gate import MotionGate
+
+
+def _decode_worker(source, ring_spec, free_slots, frame_queue, stop_event):
+	"""
+	Decode straight into free ring slots and publish (slot, index, time, moving)
+	"""
+
+	ring = FrameRing.attach(ring_spec)
+	video_stream = VideoStream(source)
+	motion_gate = MotionGate()
+	frame_index = 0
+
+	try:
+		while not stop_event.is_set():
+			try:
+				slot = free_slots.get(timeout = 0.1)
+			except queue.Empty:
+				continue
+
+			buffer = ring.slot(slot)
+			ret, frame = video_stream.read(buffer)
+			if not ret or frame is None:
+				break
+
+			if frame is not buffer:
+				# Backend reallocated instead of decoding in place
+				buffer[...] = frame
+
+			moving = motion_gate.update(buffer)
+			frame_queue.put((slot, frame_index, time.time(), moving))
+			frame_index += 1
+	finally:
+		frame_queue.put(None)
+		video_stream.release()
+		ring.close()
+
+
+def _detect_worker(detector_kwargs, ring_spec, frame_queue, result_queue, profile_queue):
+	"""
+	Run YOLO on each published slot, forward detections with the metadata
+
+	profile_queue carries camera profile switches made in the parent ('p'),
+	applied to the worker's copy of the registry before the next frame
+	"""
+
+	from yolo_detector import YOLODetector
+
+	ring = FrameRing.attach(ring_spec)
+	detector = YOLODetector(**detector_kwargs)
+
+	try:
+		while True:
+			item = frame_queue.get()
+			if item is None:
+				break
+
+			while True:
+				try:
+					profile = profile_queue.get_nowait()
+				except queue.Empty:
+					break
+				if hasattr(detector.road_region, "set_active"):
+					detector.road_region.set_active(profile)
+
+			slot, frame_index, timestamp, moving = item
+			detections = detector.detect(ring.slot(slot)) if moving else None
+			result_queue.put((slot, frame_index, timestamp, moving, detections))
+	finally:
+		result_queue.put(None)
+		ring.close()
+
+
+def run_multiprocess(source = "vid3.mp4", detector_kwargs = None, num_slots = 8, display = True):
+	"""
+	Decode, detection and analysis in separate processes
+
+	Frames live in a shared memory ring; queues carry slot indices only.
+	Analysis (filter, tracker, surface, segment, visualizers) runs here.
+
+	Returns:
+		last segment state dict (None if no frame was analyzed)
+	"""
+
+	from tracker import Tracker
+	from filters import DetectionFilter
+	from segment_analyzer import SegmentAnalyzer
+	from surface_analyzer import SurfaceAnalyzer
+	from roi_debug_visualizer import ROIDebugVisualizer
+	from frame_context import FrameContext
+
+	probe = VideoStream(source)
+	frame_shape = probe.frame_shape()
+	probe.release()
+
+	tracker = Tracker()
+	detection_filter = DetectionFilter()
+	segment_analyzer = SegmentAnalyzer()
+	surface_analyzer = SurfaceAnalyzer()
+	debug_viz = ROIDebugVisualizer(profiles = surface_analyzer.profiles)
+	ctx = FrameContext(surface_analyzer.profiles)
+
+	detector_kwargs = dict(detector_kwargs or {})
+	detector_kwargs.setdefault("road_region", surface_analyzer.profiles)
+
+	ring = FrameRing(num_slots, frame_shape)
+	free_slots = mp.Queue()
+	frame_queue = mp.Queue()
+	result_queue = mp.Queue()
+	profile_queue = mp.Queue()
+	stop_event = mp.Event()
+
+	for slot in range(num_slots):
+		free_slots.put(slot)
+
+	workers = [
+		mp.Process(
+			target = _decode_worker,
+			args = (source, ring.spec(), free_slots, frame_queue, stop_event),
+			daemon = True
+		),
+		mp.Process(
+			target = _detect_worker,
+			args = (detector_kwargs, ring.spec(), frame_queue, result_queue, profile_queue),
+			daemon = True
+		)
+	]
+
+	for worker in workers:
+		worker.start()
+
+	tracks = []
+	surface_score = 0.0
+	segment_state = None
+	prev_time = time.time()
+
+	try:
+		while True:
+			item = result_queue.get()
+			if item is None:
+				break
+
+			slot, frame_index, timestamp, moving, detections = item
+			frame = ring.slot(slot)
+			ctx.reset(frame)
+
+			current_time = time.time()
+			fps = 1.0 / max(current_time - prev_time, 1e-6)
+			prev_time = current_time
+
+			if moving:
+				detections = detection_filter.apply(detections, frame.shape)
+				tracks = tracker.update(detections)
+				surface_score = surface_analyzer.update(frame, ctx)
+
+			segment_state = segment_analyzer.update(
+				tracks,
+				frame.shape,
+				surface_score,
+				fps,
+				moving = moving
+			)
+
+			if display:
+				debug_frame = debug_viz.visualize(
+					frame,
+					surface_analyzer,
+					segment_state["surface_score"],
+					ctx = ctx
+				)
+				cv2.imshow("Demo", debug_frame)
+
+				active_profile = surface_analyzer.profiles.active
+				if not debug_viz.handle_keypress(cv2.waitKey(1) & 0xFF, debug_frame):
+					stop_event.set()
+
+				# The detector crops with its own (pickled) registry copy
+				if surface_analyzer.profiles.active != active_profile:
+					profile_queue.put(surface_analyzer.profiles.active)
+
+			frame = None
+			ctx.reset(None)
+			free_slots.put(slot)
+
+			if stop_event.is_set():
+				break
+	finally:
+		stop_event.set()
+
+		# Unblock the decoder and let the detector drain to its sentinel
+		for slot in range(num_slots):
+			free_slots.put(slot)
+
+		deadline = time.time() + 5.0
+		while any(w.is_alive() for w in workers) and time.time() < deadline:
+			try:
+				result_queue.get(timeout = 0.1)
+			except queue.Empty:
+				pass
+
+		for worker in workers:
+			worker.join(timeout = 1.0)
+			if worker.is_alive():
+				worker.terminate()
+
+		ring.close()
+
+		if display:
+			cv2.destroyAllWindows()
+
+	return segment_state
@@ -0,0 +1,66 @@
+import numpy as np
+
+
+def nms(detections, iou_threshold = 0.45, metric = "iou", groups = None, merge = False):
+	"""
+	Greedy class-agnostic non-maximum suppression on locked-format detections
+
+	Used to merge duplicates of the same object seen by overlapping tiles
+
+	Args:
+		detections: list of detection dicts with "bbox" and "confidence"
+		iou_threshold: boxes overlapping a kept box above this are dropped
+		metric: "iou" | "ios" (intersection over the smaller area; a box cut
+		        at a tile edge vs the full box in the neighbouring tile)
+		groups: optional group id per detection (e.g. tile index); boxes of
+		        the same group never suppress each other
+		merge: grow each kept box to cover the boxes it suppressed
+
+	Returns:
+		list of kept detections, highest confidence first
+	"""
+
+	if len(detections) <= 1:
+		return list(detections)
+
+	boxes = np.array([det["bbox"] for det in detections], dtype = np.float32)
+	scores = np.array([det["confidence"] for det in detections], dtype = np.float32)
+	groups = np.zeros(len(detections), dtype = np.int64) - 1 if groups is None else np.asarray(groups)
+
+	areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+	order = scores.argsort()[::-1]
+	kept = []
+
+	while order.size > 0:
+		i = order[0]
+		rest = order[1:]
+
+		xx1 = np.maximum(boxes[i, 0], boxes[rest, 0])
+		yy1 = np.maximum(boxes[i, 1], boxes[rest, 1])
+		xx2 = np.minimum(boxes[i, 2], boxes[rest, 2])
+		yy2 = np.minimum(boxes[i, 3], boxes[rest, 3])
+
+		inter = np.maximum(0.0, xx2 - xx1) * np.maximum(0.0, yy2 - yy1)
+		if metric == "ios":
+			overlap = inter / (np.minimum(areas[i], areas[rest]) + 1e-6)
+		else:
+			overlap = inter / (areas[i] + areas[rest] - inter + 1e-6)
+
+		suppressed = overlap > iou_threshold
+		if (groups >= 0).any():
+			suppressed &= groups[rest] != groups[i]
+
+		det = detections[i]
+		if merge and suppressed.any():
+			covered = boxes[np.append(rest[suppressed], i)]
+			det = dict(det, bbox = [
+				int(covered[:, 0].min()),
+				int(covered[:, 1].min()),
+				int(covered[:, 2].max()),
+				int(covered[:, 3].max())
+			])
+
+		kept.append(det)
+		order = rest[~suppressed]
+
+	return kept
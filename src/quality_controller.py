@@ -0,0 +1,204 @@
+import time
+from contextlib import contextmanager
+
+
+# Operating points, highest quality first
+# No surface-resolution knob: variance / edge density change with ROI scale
+# and SegmentAnalyzer's surface thresholds are tuned at full scale, so
+# throttling must not move dirty_distance_m / requires_cleaning
+QUALITY_LEVELS = [
+	{"detector_img_size": 640, "detect_every": 1, "overlay": "full"},
+	{"detector_img_size": 640, "detect_every": 1, "overlay": "minimal"},
+	{"detector_img_size": 512, "detect_every": 1, "overlay": "minimal"},
+	{"detector_img_size": 416, "detect_every": 2, "overlay": "minimal"},
+	{"detector_img_size": 320, "detect_every": 2, "overlay": "off"},
+	{"detector_img_size": 320, "detect_every": 3, "overlay": "off"},
+]
+
+
+class QualityController:
+	"""
+	Closed-loop controller holding a target frame rate (and optional CPU budget)
+
+	- Measures per-stage and per-frame latency (EMA) and process CPU usage
+	- Steps down one level quickly when over budget, back up slowly when
+	  comfortably under it (asymmetric hysteresis + cooldown, no oscillation)
+	- Pushes the detector size into the detector; cadence and overlay
+	  are read by the frame loop via operating_point()
+	- Measures nothing until mark_warm(): the first frames absorb model
+	  load / warmup and would seed the EMA far over budget
+	"""
+
+	def __init__(
+		self,
+		target_fps = 15.0,
+		cpu_budget = None,
+		levels = None,
+		start_level = 0,
+		ema_alpha = 0.1,
+		down_margin = 0.10,
+		up_margin = 0.30,
+		down_frames = 10,
+		up_frames = 90,
+		cooldown_frames = 30
+	):
+		"""
+		target_fps:
+			Frame rate to hold
+
+		cpu_budget:
+			Max process CPU in cores (e.g. 2.0), None = frame rate only
+
+		levels:
+			Operating points, highest quality first (default QUALITY_LEVELS)
+
+		down_margin / up_margin:
+			Step down above budget * (1 + down_margin), step up only below
+			budget * (1 - up_margin)
+
+		down_frames / up_frames:
+			Consecutive frames a condition must hold before stepping
+
+		cooldown_frames:
+			Frames after a step during which no further step is taken
+		"""
+
+		self.target_fps = target_fps
+		self.frame_budget = 1.0 / target_fps
+		self.cpu_budget = cpu_budget
+		self.levels = levels or QUALITY_LEVELS
+		self.level = start_level
+		self.ema_alpha = ema_alpha
+		self.down_margin = down_margin
+		self.up_margin = up_margin
+		self.down_frames = down_frames
+		self.up_frames = up_frames
+		self.cooldown_frames = cooldown_frames
+
+		self.frame_time_ema = None
+		self.cpu_ema = None
+		self.stage_ema = {}
+
+		self.over_count = 0
+		self.under_count = 0
+		self.cooldown = 0
+		self.frame_index = 0
+		self.level_changes = 0
+
+		self._frame_start = None
+		self._cpu_start = None
+		self.warm = False
+
+	def _ema(self, previous, value):
+		if previous is None:
+			return value
+		return (1.0 - self.ema_alpha) * previous + self.ema_alpha * value
+
+	def mark_warm(self):
+		"""
+		Start measuring (call once the first detection has completed)
+		"""
+
+		self.warm = True
+
+	@contextmanager
+	def stage(self, name):
+		if not self.warm:
+			yield
+			return
+
+		start = time.perf_counter()
+		try:
+			yield
+		finally:
+			elapsed = time.perf_counter() - start
+			self.stage_ema[name] = self._ema(self.stage_ema.get(name), elapsed)
+
+	def begin_frame(self):
+		self._frame_start = time.perf_counter()
+		self._cpu_start = time.process_time()
+
+	def end_frame(self):
+		"""
+		Update measurements and possibly step one level
+
+		Returns:
+			bool: True if the operating point changed
+		"""
+
+		if self._frame_start is None or not self.warm:
+			return False
+
+		wall = max(time.perf_counter() - self._frame_start, 1e-6)
+		cpu = (time.process_time() - self._cpu_start) / wall
+
+		self.frame_time_ema = self._ema(self.frame_time_ema, wall)
+		self.cpu_ema = self._ema(self.cpu_ema, cpu)
+		self.frame_index += 1
+
+		if self.cooldown > 0:
+			self.cooldown -= 1
+			return False
+
+		load = self.frame_time_ema / self.frame_budget
+		if self.cpu_budget is not None:
+			load = max(load, self.cpu_ema / self.cpu_budget)
+
+		if load > 1.0 + self.down_margin:
+			self.over_count += 1
+			self.under_count = 0
+		elif load < 1.0 - self.up_margin:
+			self.under_count += 1
+			self.over_count = 0
+		else:
+			self.over_count = 0
+			self.under_count = 0
+
+		if self.over_count >= self.down_frames and self.level < len(self.levels) - 1:
+			return self._step(1)
+
+		if self.under_count >= self.up_frames and self.level > 0:
+			return self._step(-1)
+
+		return False
+
+	def _step(self, direction):
+		self.level += direction
+		self.over_count = 0
+		self.under_count = 0
+		self.cooldown = self.cooldown_frames
+		self.level_changes += 1
+		return True
+
+	def apply(self, detector = None):
+		"""
+		Push the current knobs into the pipeline stages
+		"""
+
+		point = self.levels[self.level]
+
+		if detector is not None:
+			detector.set_img_size(point["detector_img_size"])
+
+	def should_detect(self):
+		"""
+		Detection cadence: run the detector on every N-th frame
+		"""
+
+		return self.frame_index % self.levels[self.level]["detect_every"] == 0
+
+	def operating_point(self):
+		"""
+		Current knobs plus the measurements that drove them
+		"""
+
+		point = dict(self.levels[self.level])
+		point.update({
+			"level": self.level,
+			"target_fps": self.target_fps,
+			"fps_ema": 1.0 / self.frame_time_ema if self.frame_time_ema else 0.0,
+			"cpu_cores_ema": self.cpu_ema or 0.0,
+			"stage_ms": {name: t * 1000.0 for name, t in self.stage_ema.items()},
+			"level_changes": self.level_changes
+		})
+		return point
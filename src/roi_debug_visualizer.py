@@ -9,47 +9,69 @@ class ROIDebugVisualizer:
     Usage:
         Press 'r' to toggle ROI overlay
         Press 's' to save current frame with annotations
+        Press 'p' to switch to the next camera profile
     """
     
-    def __init__(self):
+    def __init__(self, profiles=None):
+        """
+        Args:
+            profiles: CameraProfileRegistry for the 'p' key (usually SurfaceAnalyzer.profiles)
+        """
         self.show_roi = True
         self.frame_count = 0
+        self.profiles = profiles
+        
+        # Reused output/work buffers (reallocated only on resolution change)
+        self._vis_frame = None
+        self._gray = None
+        self._roi_small = np.empty((150, 200, 3), dtype=np.uint8)
     
-    def visualize(self, frame, surface_analyzer, surface_score):
+    def visualize(self, frame, surface_analyzer, surface_score, ctx=None):
         """
         Draw ROI and diagnostic info on frame.
         
         Args:
-            frame: Original BGR frame
+            frame: Original BGR frame (native or working resolution)
             surface_analyzer: SurfaceAnalyzer instance
             surface_score: Current surface score
+            ctx: optional FrameContext; ROI crop/gray/stats reused from it
         
         Returns:
-            Annotated frame
+            Annotated frame (internal buffer, overwritten by the next call)
         """
         self.frame_count += 1
-        vis_frame = frame.copy()
-        h, w, _ = vis_frame.shape
         
-        # Get ROI config
-        roi_config = surface_analyzer.roi_config
+        if self._vis_frame is None or self._vis_frame.shape != frame.shape:
+            self._vis_frame = np.empty_like(frame)
+        vis_frame = self._vis_frame
+        np.copyto(vis_frame, frame)
+        h, w, _ = vis_frame.shape
         
-        x1 = int(w * roi_config["x_start_ratio"])
-        x2 = int(w * roi_config["x_end_ratio"])
-        y1 = int(h * roi_config["y_start_ratio"])
-        y2 = int(h * roi_config["y_end_ratio"])
+        # Shared cached road geometry; ctx views may be at working resolution
+        # while frame is the native frame, so draw with geometry for its size
+        if ctx is not None and ctx.shape[:2] == frame.shape[:2]:
+            geometry = ctx.geometry()
+        else:
+            geometry = surface_analyzer.profiles.geometry(frame.shape)
+        x1, y1, x2, y2 = geometry.bbox
         
         if self.show_roi:
-            # Draw ROI rectangle
-            cv2.rectangle(vis_frame, (x1, y1), (x2, y2), (0, 255, 0), 3)
+            # Draw ROI polygon
+            cv2.polylines(vis_frame, [geometry.polygon], True, (0, 255, 0), 3)
             
             # Extract ROI for analysis
-            roi = frame[y1:y2, x1:x2]
+            roi = ctx.roi() if ctx is not None else geometry.crop(frame)
             
             # Show ROI stats
-            gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-            mean_intensity = np.mean(gray)
-            std_intensity = np.std(gray)
+            if ctx is not None:
+                mean_intensity, std_intensity = ctx.roi_stats()
+            else:
+                if self._gray is None or self._gray.shape != roi.shape[:2]:
+                    self._gray = np.empty(roi.shape[:2], dtype=np.uint8)
+                gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY, dst=self._gray)
+                mean, std = cv2.meanStdDev(gray, mask=geometry.mask)
+                mean_intensity = mean[0, 0]
+                std_intensity = std[0, 0]
             
             # Color code based on surface score
             if surface_score > 0.035:
@@ -80,7 +102,7 @@ class ROIDebugVisualizer:
                        (x1, info_y + 40), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
             
             # Show ROI in corner
-            roi_small = cv2.resize(roi, (200, 150))
+            roi_small = cv2.resize(roi, (200, 150), dst=self._roi_small)
             vis_frame[10:160, w-210:w-10] = roi_small
             cv2.rectangle(vis_frame, (w-210, 10), (w-10, 160), status_color, 2)
         
@@ -106,6 +128,9 @@ class ROIDebugVisualizer:
             cv2.imwrite(filename, frame)
             print(f"Saved: {filename}")
         
+        elif key == ord('p') and self.profiles is not None:
+            print(f"Camera profile: {self.profiles.next_profile()}")
+        
         elif key == 27:  # ESC
             return False
         
@@ -46,6 +46,32 @@ class SegmentAnalyzer:
         # Diagnosis
         self.last_accumulation_reason = "none"
         self.last_decay_reason = "none"
+        self.last_state = None
+        self.last_object_score = 0.0
+
+    def state_dict(self):
+        """
+        State machine snapshot for checkpointing.
+        """
+        return {
+            "window": list(self.window),
+            "requires_cleaning": self.requires_cleaning,
+            "clean_frame_count": self.clean_frame_count,
+            "dirty_frame_count": self.dirty_frame_count,
+            "dirty_distance_m": self.dirty_distance_m,
+            "last_object_score": self.last_object_score,
+            "last_state": self.last_state,
+        }
+
+    def load_state_dict(self, state):
+        self.window.clear()
+        self.window.extend(state["window"])
+        self.requires_cleaning = state["requires_cleaning"]
+        self.clean_frame_count = state["clean_frame_count"]
+        self.dirty_frame_count = state["dirty_frame_count"]
+        self.dirty_distance_m = state["dirty_distance_m"]
+        self.last_object_score = state["last_object_score"]
+        self.last_state = state["last_state"]
 
     def compute_object_score(self, tracks, frame_shape):
         """
@@ -160,24 +186,36 @@ class SegmentAnalyzer:
         # hard cap
         self.dirty_distance_m = min(self.dirty_distance_m, self.DIRTY_DISTANCE_HARD_CAP)
 
-    def update(self, tracks, frame_shape, surface_score, fps):
+    def update(self, tracks, frame_shape, surface_score, fps, moving=True):
         """
         Main loop
         
         Args:
-            - tracks: list of track objects
+            - tracks: list of track objects, or None when detection did not
+              run on this frame (cascade / cadence); the last measured object
+              score is held instead of counting the frame as litter-free
             - frame_shape: (H, W, C)
             - surface_score: float from SurfaceAnalyzer 
             - fps: current fps
+            - moving: False when the vehicle is stationary (MotionGate);
+              distance and smoothing are frozen and the last state is reused
 
         Returns:
             - dict with keys: requires_cleaning, avg_score, dirty_distance_m, surface_score
         """
 
+        if not moving and self.last_state is not None:
+            # No distance covered, nothing new seen
+            return dict(self.last_state)
+
         h, w, _ = frame_shape
 
         # Object based score
-        object_score = self.compute_object_score(tracks, frame_shape)
+        if tracks is None:
+            object_score = self.last_object_score
+        else:
+            object_score = self.compute_object_score(tracks, frame_shape)
+            self.last_object_score = object_score
 
         frame_score = (1.0 - self.SURFACE_WEIGHT) * object_score + self.SURFACE_WEIGHT * surface_score
         self.window.append(frame_score)
@@ -203,7 +241,7 @@ class SegmentAnalyzer:
                 self.requires_cleaning = False
 
 
-        return {
+        self.last_state = {
             "requires_cleaning": self.requires_cleaning,
             "avg_score": float(avg_score),
             "dirty_distance_m": float(self.dirty_distance_m),
@@ -212,3 +250,5 @@ class SegmentAnalyzer:
             "clean_frame_count": self.clean_frame_count,
             "dirty_frame_count": self.dirty_frame_count,
         }
+
+        return dict(self.last_state)
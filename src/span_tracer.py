@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import queue
+import threading
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+
+class SpanTracer:
+	"""
+	Opt-in per-frame span tracing
+
+	- Complete begin/end spans with process and thread IDs into a ring buffer
+	- Dumps Chrome trace / Perfetto JSON on demand or when a frame exceeds
+	  spike_ms (with the frames leading up to it still in the buffer)
+	- Spike dumps only snapshot the buffer in the frame loop; serializing
+	  and writing happen on a background thread (slow SD cards)
+	- Disabled tracer returns a shared no-op context (near-zero cost)
+	"""
+
+	def __init__(self, enabled = False, capacity = 20000, spike_ms = None, dump_dir = "traces"):
+		"""
+		capacity:
+			Max spans kept (oldest dropped first)
+
+		spike_ms:
+			Frame duration that triggers an automatic dump, None = never
+
+		dump_dir:
+			Where dumps are written
+		"""
+
+		self.enabled = enabled
+		self.spans = deque(maxlen = capacity)
+		self.spike_ms = spike_ms
+		self.dump_dir = dump_dir
+		self.spike_cooldown_frames = 100
+
+		self._null = nullcontext()
+		self._frame_start = None
+		self._frame_index = 0
+		self._last_spike_frame = None
+
+		self._writes = queue.Queue()
+		self._writer = None
+
+	def enable(self, capacity = None, spike_ms = None, dump_dir = None):
+		if capacity is not None:
+			self.spans = deque(self.spans, maxlen = capacity)
+		if spike_ms is not None:
+			self.spike_ms = spike_ms
+		if dump_dir is not None:
+			self.dump_dir = dump_dir
+		self.enabled = True
+
+	def span(self, name, **args):
+		if not self.enabled:
+			return self._null
+		return self._span(name, args)
+
+	# Same interface as MemoryTracer / QualityController
+	stage = span
+
+	@contextmanager
+	def _span(self, name, args):
+		start = time.perf_counter_ns()
+		try:
+			yield
+		finally:
+			self._record(name, start, time.perf_counter_ns(), args)
+
+	def _record(self, name, start_ns, end_ns, args):
+		self.spans.append((
+			name,
+			start_ns // 1000,
+			(end_ns - start_ns) // 1000,
+			os.getpid(),
+			threading.get_ident(),
+			args or None
+		))
+
+	def begin_frame(self):
+		if self.enabled:
+			self._frame_start = time.perf_counter_ns()
+
+	def end_frame(self):
+		"""
+		Close the frame span; dumps automatically on a latency spike
+
+		Returns:
+			dump path if a spike dump was queued, else None
+		"""
+
+		if not self.enabled or self._frame_start is None:
+			return None
+
+		end = time.perf_counter_ns()
+		self._record("frame", self._frame_start, end, {"index": self._frame_index})
+		duration_ms = (end - self._frame_start) / 1e6
+		self._frame_start = None
+		self._frame_index += 1
+
+		if self.spike_ms is None or duration_ms <= self.spike_ms:
+			return None
+
+		if self._last_spike_frame is not None and \
+				self._frame_index - self._last_spike_frame < self.spike_cooldown_frames:
+			return None
+
+		self._last_spike_frame = self._frame_index
+		return self.dump(f"spike_{self._frame_index:06d}_{duration_ms:.0f}ms.json", background = True)
+
+	def to_chrome_trace(self, spans = None):
+		events = []
+		threads = set()
+
+		for name, ts, dur, pid, tid, args in (list(self.spans) if spans is None else spans):
+			event = {"name": name, "ph": "X", "ts": ts, "dur": dur, "pid": pid, "tid": tid}
+			if args:
+				event["args"] = args
+			events.append(event)
+			threads.add((pid, tid))
+
+		for pid, tid in threads:
+			events.append({
+				"name": "thread_name",
+				"ph": "M",
+				"pid": pid,
+				"tid": tid,
+				"args": {"name": f"thread-{tid}"}
+			})
+
+		return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+	def dump(self, filename = None, background = False):
+		"""
+		Write the ring buffer as Chrome trace JSON (chrome://tracing, Perfetto)
+
+		background:
+			Snapshot the buffer now, serialize and write on the writer thread
+
+		Returns:
+			path written (or being written)
+		"""
+
+		filename = filename or f"trace_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}.json"
+		path = os.path.join(self.dump_dir, filename)
+		spans = list(self.spans)
+
+		if not background:
+			self._write(path, spans)
+			return path
+
+		if self._writer is None:
+			self._writer = threading.Thread(target = self._run_writer, daemon = True)
+			self._writer.start()
+
+		self._writes.put((path, spans))
+		return path
+
+	def _run_writer(self):
+		while True:
+			item = self._writes.get()
+			if item is None:
+				return
+			try:
+				self._write(*item)
+			except OSError as e:
+				print(f"SpanTracer: could not write {item[0]}: {e}")
+
+	def _write(self, path, spans):
+		os.makedirs(self.dump_dir, exist_ok = True)
+		with open(path, "w") as f:
+			json.dump(self.to_chrome_trace(spans), f)
+
+	def close(self, timeout = 10.0):
+		"""
+		Finish queued background dumps
+		"""
+
+		if self._writer is not None:
+			self._writes.put(None)
+			self._writer.join(timeout)
+			self._writer = None
+
+
+# Process-wide tracer; stages call TRACER.span(...) and pay nothing until
+# main() enables it
+TRACER = SpanTracer()
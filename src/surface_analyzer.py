@@ -2,97 +2,106 @@ import cv2
 import numpy as np
 from collections import deque
 
+from camera_profiles import CameraProfileRegistry
+from span_tracer import TRACER
+from texture_features import TextureFeatureEngine
+
 
 class SurfaceAnalyzer:
     """
     Surface texture analysis with viewpoint robustness.
     
     CRITICAL DEPLOYMENT NOTE:
-    - Current ROI tuned for BIKE-MOUNTED LEFT-SIDE CAMERA
-    - MUST be recalibrated for van top-down deployment
-    - Flag: BIKE_CAMERA_MODE vs VAN_CAMERA_MODE
+    - Default ROI tuned for BIKE-MOUNTED LEFT-SIDE CAMERA
+    - Van and other mounts: add/select a polygon profile in
+      camera_profiles.json (see CameraProfileRegistry), no code edits
     """
     
-    # === ROI Configuration ===
-    BIKE_CAMERA_MODE = True  # False for van
-    
     # Sky detection threshold
     SKY_INTENSITY_THRESHOLD = 200  # Mean intensity above this = sky
     SKY_SATURATION_THRESHOLD = 30  # Low saturation + high intensity = overexposed
     
-    # Weighting for texture components
+    # Weighting for texture components (default feature set)
     VARIANCE_WEIGHT = 0.6
     EDGE_WEIGHT = 0.4
 
-    def __init__(self, window_size=15):
+    def __init__(self, window_size=15, profiles=None, feature_weights=None):
         """
         Args:
             window_size: Temporal smoothing window (reduced from 30 for faster response)
+            profiles: CameraProfileRegistry shared with detector/visualizers
+                      (default: loaded from camera_profiles.json)
+            feature_weights: {feature name: weight} from texture_features.FEATURES
+                             (default: variance + Canny edge density)
         """
         self.window = deque(maxlen=window_size)
         
-        # ROI configuration - will be set based on camera mode
-        self.roi_config = self._get_roi_config()
+        # ROI geometry comes from the shared camera-profile registry
+        self.profiles = profiles if profiles is not None else CameraProfileRegistry.load()
+        self.geometry = None
+        
+        # Pluggable texture features, see texture_features.compare_features
+        if feature_weights is None:
+            feature_weights = {"variance": self.VARIANCE_WEIGHT, "canny": self.EDGE_WEIGHT}
+        self.features = TextureFeatureEngine(feature_weights, tracer=TRACER)
+        
+        # Work buffers reused every frame, reallocated only if ROI shape changes
+        self._buffers = None
+        self._buffers_shape = None
         
         # Diagnostic counters
         self.sky_suppression_count = 0
         self.total_frames = 0
 
-    def _get_roi_config(self):
-        """
-        Returns ROI configuration based on camera mounting.
-        """
-        if self.BIKE_CAMERA_MODE:
-            # Bike camera: side-mounted, angled left
-            # Road is in center-left and lower portion
-            return {
-                "x_start_ratio": 0.25,  # Start 25% from left
-                "x_end_ratio": 0.65,    # End 65% from left
-                "y_start_ratio": 0.50,  # Start 50% from top
-                "y_end_ratio": 1.0      # Full height
-            }
-        else:
-            # Van camera: top-mounted, angled down+forward
-            # Road is in center and lower portion
-            return {
-                "x_start_ratio": 0.30,
-                "x_end_ratio": 0.70,
-                "y_start_ratio": 0.60,
-                "y_end_ratio": 1.0
-            }
+    @property
+    def roi_config(self):
+        """
+        Bounding ratios of the active road polygon (legacy rectangle format).
+        """
+        return self.profiles.roi_config
 
     def _extract_roi(self, frame):
         """
-        Extract region of interest based on camera configuration.
+        Extract the bounding crop of the road polygon; self.geometry holds the
+        cached mask used for the masked statistics below.
         """
-        h, w, _ = frame.shape
-        
-        x1 = int(w * self.roi_config["x_start_ratio"])
-        x2 = int(w * self.roi_config["x_end_ratio"])
-        y1 = int(h * self.roi_config["y_start_ratio"])
-        y2 = int(h * self.roi_config["y_end_ratio"])
-        
-        roi = frame[y1:y2, x1:x2]
-        return roi
+        self.geometry = self.profiles.geometry(frame.shape)
+        return self.geometry.crop(frame)
+
+    def _get_buffers(self, roi_shape):
+        """
+        Per-resolution work buffers (HSV, V channel, gray, edge/bright masks).
+        """
+        if self._buffers_shape != roi_shape[:2]:
+            h, w = roi_shape[:2]
+            self._buffers = {
+                "hsv": np.empty((h, w, 3), dtype=np.uint8),
+                "v": np.empty((h, w), dtype=np.uint8),
+                "gray": np.empty((h, w), dtype=np.uint8),
+                "mask": np.empty((h, w), dtype=np.uint8),
+            }
+            self._buffers_shape = roi_shape[:2]
+        return self._buffers
 
-    def _is_sky_or_overexposed(self, roi):
+    def _is_sky_or_overexposed(self, roi, hsv=None):
         """
         Detect if ROI contains sky or bright overexposure artifacts.
         
+        Args:
+            hsv: precomputed HSV of roi (FrameContext), converted here if None
+        
         Returns:
             bool: True if ROI should be suppressed
         """
-        # Convert to HSV for better sky detection
-        hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
+        buffers = self._get_buffers(roi.shape)
         
-        # Extract channels
-        h_channel, s_channel, v_channel = cv2.split(hsv)
-        
-        # Mean intensity
-        mean_intensity = np.mean(v_channel)
+        # Convert to HSV for better sky detection
+        if hsv is None:
+            hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV, dst=buffers["hsv"])
         
-        # Mean saturation
-        mean_saturation = np.mean(s_channel)
+        # Per-channel means straight from HSV (no split), inside the polygon
+        mask = self.geometry.mask
+        _, mean_saturation, mean_intensity, _ = cv2.mean(hsv, mask=mask)
         
         # Sky characteristics:
         # - High intensity (bright)
@@ -101,46 +110,31 @@ class SurfaceAnalyzer:
                   mean_saturation < self.SKY_SATURATION_THRESHOLD)
         
         # Also check for overexposure (very bright pixels)
-        bright_pixel_ratio = np.mean(v_channel > 240)
+        v_channel = cv2.extractChannel(hsv, 2, dst=buffers["v"])
+        bright = cv2.threshold(v_channel, 240, 255, cv2.THRESH_BINARY, dst=buffers["mask"])[1]
+        if mask is not None:
+            cv2.bitwise_and(bright, mask, dst=bright)
+        bright_pixel_ratio = cv2.countNonZero(bright) / max(self.geometry.pixel_count, 1)
         is_overexposed = bright_pixel_ratio > 0.4
         
         return is_sky or is_overexposed
 
-    def _texture_variance(self, gray):
-        """
-        Normalized local variance as texture disorder proxy.
-        
-        Higher variance = more texture variation = potentially dirtier
-        """
-        return np.var(gray) / (255.0 ** 2)
-
-    def _edge_density(self, gray):
-        """
-        Fraction of pixels that are edges.
-        
-        More edges = more texture detail = potentially dirtier
-        """
-        edges = cv2.Canny(gray, 50, 150)
-        return np.mean(edges > 0)
-
     def _compute_raw_score(self, gray):
         """
         Compute raw surface score from texture features.
-        """
-        var_score = self._texture_variance(gray)
-        edge_score = self._edge_density(gray)
-        
-        raw_score = self.VARIANCE_WEIGHT * var_score + self.EDGE_WEIGHT * edge_score
-        raw_score = float(np.clip(raw_score, 0.0, 1.0))
         
-        return raw_score
+        Higher variance / more edges = more texture detail = potentially dirtier
+        """
+        return self.features.score(gray, self.geometry.mask, self.geometry.pixel_count)
 
-    def update(self, frame):
+    def update(self, frame, ctx=None):
         """
         Analyze surface texture and return smoothed score.
         
         Args:
             frame: BGR image (numpy array)
+            ctx: optional FrameContext for this frame; ROI crop, HSV and gray
+                 are then taken from (and shared through) its cache
         
         Returns:
             float: Smoothed surface score [0.0, 1.0]
@@ -150,16 +144,28 @@ class SurfaceAnalyzer:
         self.total_frames += 1
         
         # Extract ROI
-        roi = self._extract_roi(frame)
+        hsv = None
+        if ctx is not None:
+            roi = ctx.roi()
+            hsv = ctx.roi_hsv()
+            self.geometry = ctx.geometry()
+        else:
+            roi = self._extract_roi(frame)
         
         # Check for sky/overexposure
-        if self._is_sky_or_overexposed(roi):
+        with TRACER.span("surface.sky_gate"):
+            suppressed = self._is_sky_or_overexposed(roi, hsv)
+        
+        if suppressed:
             self.sky_suppression_count += 1
             self.window.append(0.0)
             return 0.0
         
         # Convert to grayscale
-        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+        if ctx is not None:
+            gray = ctx.roi_gray()
+        else:
+            gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY, dst=self._get_buffers(roi.shape)["gray"])
         
         # Compute raw score
         raw_score = self._compute_raw_score(gray)
@@ -172,13 +178,99 @@ class SurfaceAnalyzer:
         
         return smooth_score
 
+    def update_batch(self, frames):
+        """
+        Batched equivalent of calling update() on each frame in order.
+        
+        The ROI stack is converted as one tall image and the sky gate,
+        variance and smoothing run as array ops over the time axis; features
+        without a vectorized form (Canny) still run once per frame.
+        Results match sequential update() up to float rounding (~1e-12).
+        
+        Args:
+            frames: (N, H, W, 3) uint8 array or list of equally sized BGR frames
+        
+        Returns:
+            (raw_scores, smoothed_scores): float64 arrays of length N,
+            smoothed is 0.0 where the frame was suppressed (as update() returns)
+        """
+        frames = np.asarray(frames)
+        n = len(frames)
+        if n == 0:
+            return np.zeros(0), np.zeros(0)
+        
+        self.total_frames += n
+        
+        # Shared ROI geometry, one crop for the whole stack
+        self.geometry = self.profiles.geometry(frames.shape[1:])
+        x1, y1, x2, y2 = self.geometry.bbox
+        rois = np.ascontiguousarray(frames[:, y1:y2, x1:x2])
+        
+        _, h, w, _ = rois.shape
+        mask = self.geometry.mask
+        pixel_count = self.geometry.pixel_count
+        
+        # Sky / overexposure gate for all frames
+        with TRACER.span("surface.sky_gate", frames=n):
+            hsv = cv2.cvtColor(rois.reshape(n * h, w, 3), cv2.COLOR_BGR2HSV).reshape(n, h * w, 3)
+            if mask is not None:
+                hsv = hsv[:, mask.ravel() > 0]
+            
+            mean_saturation = hsv[..., 1].mean(axis=1)
+            mean_intensity = hsv[..., 2].mean(axis=1)
+            bright_pixel_ratio = (hsv[..., 2] > 240).sum(axis=1) / max(pixel_count, 1)
+            
+            suppressed = (
+                ((mean_intensity > self.SKY_INTENSITY_THRESHOLD) &
+                 (mean_saturation < self.SKY_SATURATION_THRESHOLD)) |
+                (bright_pixel_ratio > 0.4)
+            )
+        
+        self.sky_suppression_count += int(suppressed.sum())
+        
+        # Texture features on the remaining frames
+        raw_scores = np.zeros(n, dtype=np.float64)
+        active = ~suppressed
+        m = int(active.sum())
+        if m:
+            grays = cv2.cvtColor(rois[active].reshape(m * h, w, 3), cv2.COLOR_BGR2GRAY).reshape(m, h, w)
+            raw_scores[active] = self.features.score_batch(grays, mask, pixel_count)
+        
+        # Running mean over the deque window, continuing from its current state
+        history = np.concatenate([np.array(self.window, dtype=np.float64), raw_scores])
+        csum = np.concatenate([[0.0], np.cumsum(history)])
+        ends = np.arange(len(self.window) + 1, len(history) + 1)
+        starts = np.maximum(ends - self.window.maxlen, 0)
+        smoothed = (csum[ends] - csum[starts]) / (ends - starts)
+        smoothed[suppressed] = 0.0
+        
+        self.window.extend(raw_scores.tolist())
+        
+        return raw_scores, smoothed
+
+    def state_dict(self):
+        """
+        Temporal state for checkpointing (smoothing window + counters).
+        """
+        return {
+            "window": list(self.window),
+            "sky_suppression_count": self.sky_suppression_count,
+            "total_frames": self.total_frames,
+        }
+
+    def load_state_dict(self, state):
+        self.window.clear()
+        self.window.extend(state["window"])
+        self.sky_suppression_count = state["sky_suppression_count"]
+        self.total_frames = state["total_frames"]
+
     def get_diagnostics(self):
         """
         Return diagnostic info for tuning and debugging.
         """
         suppression_rate = (self.sky_suppression_count / max(self.total_frames, 1)) * 100
         return {
-            "camera_mode": "bike" if self.BIKE_CAMERA_MODE else "van",
+            "camera_mode": self.profiles.active,
             "roi_config": self.roi_config,
             "sky_suppression_rate": f"{suppression_rate:.1f}%",
             "total_frames": self.total_frames
@@ -0,0 +1,375 @@
+import sys
+import time
+import cv2
+import numpy as np
+
+
+class TextureFeature:
+    """
+    One scalar texture feature computed on the grayscale road ROI.
+
+    Subclasses implement compute(gray, mask, pixel_count) -> float in ~[0, 1]:
+        gray: uint8 ROI crop
+        mask: uint8 0/255 road mask (None = whole crop)
+        pixel_count: number of road pixels
+    Work buffers are kept per ROI shape and reused across frames.
+    """
+
+    name = "feature"
+
+    def __init__(self):
+        self._buffers = {}
+        self._buffers_shape = None
+
+    def _buffer(self, key, shape, dtype):
+        if self._buffers_shape != shape:
+            self._buffers = {}
+            self._buffers_shape = shape
+        buf = self._buffers.get(key)
+        if buf is None or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+            self._buffers[key] = buf
+        return buf
+
+    def compute(self, gray, mask, pixel_count):
+        raise NotImplementedError
+
+    def compute_batch(self, grays, mask, pixel_count):
+        """
+        Feature for a (N, H, W) stack; override with a vectorized version
+        where the feature allows it.
+        """
+        return np.array([self.compute(gray, mask, pixel_count) for gray in grays], dtype=np.float64)
+
+
+class VarianceFeature(TextureFeature):
+    """
+    Global intensity variance (current default).
+    """
+
+    name = "variance"
+
+    def compute(self, gray, mask, pixel_count):
+        _, std = cv2.meanStdDev(gray, mask=mask)
+        return float(std[0, 0]) ** 2 / (255.0 ** 2)
+
+    def compute_batch(self, grays, mask, pixel_count):
+        flat = grays.reshape(len(grays), -1)
+        if mask is not None:
+            flat = flat[:, mask.ravel() > 0]
+        return flat.var(axis=1) / (255.0 ** 2)
+
+
+class CannyEdgeFeature(TextureFeature):
+    """
+    Canny edge fraction (current default, the expensive one).
+    """
+
+    name = "canny"
+
+    def compute(self, gray, mask, pixel_count):
+        edges = cv2.Canny(gray, 50, 150, edges=self._buffer("edges", gray.shape, np.uint8))
+        if mask is not None:
+            cv2.bitwise_and(edges, mask, dst=edges)
+        return cv2.countNonZero(edges) / max(pixel_count, 1)
+
+
+class GradientDensityFeature(TextureFeature):
+    """
+    Fraction of pixels with L1 gradient magnitude above threshold.
+    No smoothing / non-max suppression / hysteresis, so much cheaper than Canny.
+    """
+
+    def __init__(self, threshold=100, scharr=False):
+        super().__init__()
+        self.threshold = threshold
+        self.scharr = scharr
+        self.name = "scharr" if scharr else "sobel"
+
+    def compute(self, gray, mask, pixel_count):
+        shape = gray.shape
+        gx = self._buffer("gx", shape, np.int16)
+        gy = self._buffer("gy", shape, np.int16)
+        ax = self._buffer("ax", shape, np.uint8)
+        ay = self._buffer("ay", shape, np.uint8)
+
+        if self.scharr:
+            cv2.Scharr(gray, cv2.CV_16S, 1, 0, dst=gx)
+            cv2.Scharr(gray, cv2.CV_16S, 0, 1, dst=gy)
+        else:
+            cv2.Sobel(gray, cv2.CV_16S, 1, 0, dst=gx, ksize=3)
+            cv2.Sobel(gray, cv2.CV_16S, 0, 1, dst=gy, ksize=3)
+
+        cv2.convertScaleAbs(gx, dst=ax)
+        cv2.convertScaleAbs(gy, dst=ay)
+        cv2.add(ax, ay, dst=ax)
+        cv2.threshold(ax, self.threshold, 255, cv2.THRESH_BINARY, dst=ax)
+
+        if mask is not None:
+            cv2.bitwise_and(ax, mask, dst=ax)
+        return cv2.countNonZero(ax) / max(pixel_count, 1)
+
+
+class LocalVarianceFeature(TextureFeature):
+    """
+    Mean local (box-filter) variance: texture without the illumination
+    gradients that inflate global variance.
+    """
+
+    def __init__(self, ksize=7):
+        super().__init__()
+        self.ksize = (ksize, ksize)
+        self.name = "local_variance"
+
+    def compute(self, gray, mask, pixel_count):
+        shape = gray.shape
+        g = self._buffer("g", shape, np.float32)
+        mu = self._buffer("mu", shape, np.float32)
+        mu2 = self._buffer("mu2", shape, np.float32)
+
+        np.copyto(g, gray)
+        cv2.boxFilter(g, cv2.CV_32F, self.ksize, dst=mu)
+        cv2.sqrBoxFilter(g, cv2.CV_32F, self.ksize, dst=mu2)
+        cv2.multiply(mu, mu, dst=mu)
+        cv2.subtract(mu2, mu, dst=mu2)
+
+        return cv2.mean(mu2, mask=mask)[0] / (255.0 ** 2)
+
+
+class LBPFeature(TextureFeature):
+    """
+    Normalized entropy of the 8-neighbour local binary pattern histogram.
+    """
+
+    name = "lbp"
+
+    OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1)]
+
+    def compute(self, gray, mask, pixel_count):
+        h, w = gray.shape
+        if h < 3 or w < 3:
+            return 0.0
+
+        center = gray[1:-1, 1:-1]
+        codes = self._buffer("codes", (h - 2, w - 2), np.uint8)
+        bit = self._buffer("bit", (h - 2, w - 2), np.uint8)
+        codes.fill(0)
+
+        for i, (dy, dx) in enumerate(self.OFFSETS):
+            neighbour = gray[1 + dy:h - 1 + dy, 1 + dx:w - 1 + dx]
+            np.greater_equal(neighbour, center, out=bit.view(np.bool_))
+            np.left_shift(bit, i, out=bit)
+            np.bitwise_or(codes, bit, out=codes)
+
+        valid = codes if mask is None else codes[mask[1:-1, 1:-1] > 0]
+        hist = np.bincount(valid.ravel(), minlength=256).astype(np.float64)
+        return _normalized_entropy(hist, 8.0)
+
+
+class GradientHistogramFeature(TextureFeature):
+    """
+    Normalized entropy of the magnitude-weighted gradient orientation
+    histogram (HOG-style, one cell over the ROI).
+    """
+
+    name = "grad_hist"
+
+    def __init__(self, bins=9):
+        super().__init__()
+        self.bins = bins
+
+    def compute(self, gray, mask, pixel_count):
+        shape = gray.shape
+        gx = self._buffer("gx", shape, np.float32)
+        gy = self._buffer("gy", shape, np.float32)
+        mag = self._buffer("mag", shape, np.float32)
+        ang = self._buffer("ang", shape, np.float32)
+
+        cv2.Sobel(gray, cv2.CV_32F, 1, 0, dst=gx, ksize=3)
+        cv2.Sobel(gray, cv2.CV_32F, 0, 1, dst=gy, ksize=3)
+        cv2.cartToPolar(gx, gy, magnitude=mag, angle=ang, angleInDegrees=True)
+
+        # Unsigned orientation
+        bins = (np.mod(ang, 180.0) * (self.bins / 180.0)).astype(np.int32)
+        np.minimum(bins, self.bins - 1, out=bins)
+
+        if mask is not None:
+            keep = mask > 0
+            bins, weights = bins[keep], mag[keep]
+        else:
+            weights = mag
+
+        hist = np.bincount(bins.ravel(), weights=weights.ravel(), minlength=self.bins)
+        return _normalized_entropy(hist, np.log2(self.bins))
+
+
+def _normalized_entropy(hist, max_bits):
+    total = hist.sum()
+    if total <= 0:
+        return 0.0
+    p = hist[hist > 0] / total
+    return float(-(p * np.log2(p)).sum() / max_bits)
+
+
+FEATURES = {
+    "variance": VarianceFeature,
+    "canny": CannyEdgeFeature,
+    "sobel": lambda: GradientDensityFeature(scharr=False),
+    "scharr": lambda: GradientDensityFeature(scharr=True),
+    "local_variance": LocalVarianceFeature,
+    "lbp": LBPFeature,
+    "grad_hist": GradientHistogramFeature,
+}
+
+# Current SurfaceAnalyzer scoring
+DEFAULT_WEIGHTS = {"variance": 0.6, "canny": 0.4}
+
+
+class TextureFeatureEngine:
+    """
+    Weighted sum of selected texture features, clipped to [0, 1].
+
+    Usage:
+        engine = TextureFeatureEngine({"variance": 0.6, "sobel": 0.4})
+        score = engine.score(gray, mask, pixel_count)
+    """
+
+    def __init__(self, weights=None, tracer=None):
+        """
+        Args:
+            weights: {feature name: weight}, names from FEATURES
+            tracer: optional span tracer, one span per feature ("surface.<name>")
+        """
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        self.tracer = tracer
+
+        unknown = set(self.weights) - set(FEATURES)
+        if unknown:
+            raise KeyError(f"Unknown texture features: {sorted(unknown)}")
+
+        self.features = {name: FEATURES[name]() for name in self.weights}
+
+    def compute_all(self, gray, mask, pixel_count):
+        """
+        Returns:
+            {feature name: value}
+        """
+        values = {}
+        for name, feature in self.features.items():
+            if self.tracer is not None:
+                with self.tracer.span(f"surface.{name}"):
+                    values[name] = feature.compute(gray, mask, pixel_count)
+            else:
+                values[name] = feature.compute(gray, mask, pixel_count)
+        return values
+
+    def score(self, gray, mask=None, pixel_count=None):
+        if pixel_count is None:
+            pixel_count = gray.size if mask is None else cv2.countNonZero(mask)
+
+        values = self.compute_all(gray, mask, pixel_count)
+        raw_score = sum(self.weights[name] * value for name, value in values.items())
+        return float(np.clip(raw_score, 0.0, 1.0))
+
+    def score_batch(self, grays, mask=None, pixel_count=None):
+        """
+        Scores for a (N, H, W) gray stack, same values as score() per frame.
+        """
+        if pixel_count is None:
+            pixel_count = grays[0].size if mask is None else cv2.countNonZero(mask)
+
+        raw_scores = np.zeros(len(grays), dtype=np.float64)
+        for name, feature in self.features.items():
+            raw_scores += self.weights[name] * feature.compute_batch(grays, mask, pixel_count)
+        return np.clip(raw_scores, 0.0, 1.0)
+
+
+def compare_features(grays, masks=None, labels=None, feature_names=None):
+    """
+    Cost and agreement of every candidate feature against the current score.
+
+    Args:
+        grays: list of uint8 gray ROI crops (sky-gated frames excluded)
+        masks: optional list of matching masks (None entries allowed)
+        labels: optional list of 0 (clean) / 1 (dirty) per frame
+        feature_names: subset of FEATURES (default all)
+
+    Returns:
+        {name: {"ms_per_frame", "corr_with_current", "separation"}}
+        separation = (mean dirty - mean clean) / pooled std, if labels given
+    """
+    feature_names = feature_names or list(FEATURES)
+    masks = masks or [None] * len(grays)
+    reference_engine = TextureFeatureEngine(DEFAULT_WEIGHTS)
+
+    reference = np.array([
+        reference_engine.score(g, m) for g, m in zip(grays, masks)
+    ])
+
+    report = {}
+    for name in feature_names:
+        feature = FEATURES[name]()
+        values = np.empty(len(grays))
+
+        start = time.perf_counter()
+        for i, (gray, mask) in enumerate(zip(grays, masks)):
+            pixel_count = gray.size if mask is None else cv2.countNonZero(mask)
+            values[i] = feature.compute(gray, mask, pixel_count)
+        elapsed = time.perf_counter() - start
+
+        if len(values) > 1 and values.std() > 0 and reference.std() > 0:
+            corr = float(np.corrcoef(values, reference)[0, 1])
+        else:
+            corr = float("nan")
+
+        separation = float("nan")
+        if labels is not None:
+            labels_arr = np.asarray(labels)
+            dirty, clean = values[labels_arr == 1], values[labels_arr == 0]
+            if len(dirty) > 1 and len(clean) > 1:
+                pooled = np.sqrt((dirty.var() + clean.var()) / 2.0)
+                if pooled > 0:
+                    separation = float((dirty.mean() - clean.mean()) / pooled)
+
+        report[name] = {
+            "ms_per_frame": elapsed * 1000.0 / max(len(grays), 1),
+            "corr_with_current": corr,
+            "separation": separation,
+        }
+
+    return report
+
+
+def _collect_rois(video_path, max_frames):
+    from surface_analyzer import SurfaceAnalyzer
+
+    analyzer = SurfaceAnalyzer()
+    cap = cv2.VideoCapture(video_path)
+    grays, masks = [], []
+
+    while len(grays) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        roi = analyzer._extract_roi(frame)
+        if analyzer._is_sky_or_overexposed(roi):
+            continue
+        grays.append(cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY))
+        masks.append(analyzer.geometry.mask)
+
+    cap.release()
+    return grays, masks
+
+
+if __name__ == "__main__":
+    # python texture_features.py ride.mp4 [max_frames]
+    path = sys.argv[1] if len(sys.argv) > 1 else "vid3.mp4"
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    grays, masks = _collect_rois(path, limit)
+    print(f"{len(grays)} road frames from {path}")
+    for name, stats in compare_features(grays, masks).items():
+        print(
+            f"  {name:<15} {stats['ms_per_frame']:7.3f} ms/frame"
+            f" | corr {stats['corr_with_current']:+.3f}"
+        )
@@ -66,4 +66,21 @@ class Tracker:
 
 		mature_tracks = [t for t in self.tracks if t.age >= self.min_age]
 
-		return mature_tracks
\ No newline at end of file
+		return mature_tracks
+
+	def state_dict(self):
+		"""
+		Compact snapshot of live tracks (checkpointing)
+		"""
+		return [
+			[list(t.bbox), t.cls, t.confidence, t.age, t.missed]
+			for t in self.tracks
+		]
+
+	def load_state_dict(self, state):
+		self.tracks = []
+		for bbox, cls, confidence, age, missed in state:
+			track = Track({"bbox": bbox, "class": cls, "confidence": confidence})
+			track.age = age
+			track.missed = missed
+			self.tracks.append(track)
\ No newline at end of file
@@ -1,4 +1,5 @@
 import cv2
+import numpy as np
 
 class VideoStream:
 
@@ -8,8 +9,48 @@ class VideoStream:
 			raise RuntimeError("Cannot open video source")
 
 
-	def read(self):
-		return self.cap.read()
+	def read(self, frame = None):
+		"""
+		frame: optional preallocated (H, W, 3) uint8 buffer to decode into
+		"""
+		if frame is None:
+			return self.cap.read()
+		return self.cap.read(frame)
+
+	def read_chunk(self, count, out = None):
+		"""
+		Decode up to count frames into a (N, H, W, 3) stack (batched analysis)
+
+		out: optional preallocated (count, H, W, 3) uint8 array, reused per chunk
+
+		Returns:
+			stack view of the frames actually read (length 0 at end of stream)
+		"""
+		if out is None:
+			out = np.empty((count,) + self.frame_shape(), dtype = np.uint8)
+
+		n = 0
+		while n < count:
+			# One view per slot: out[n] builds a new view object on every call
+			slot = out[n]
+			ret, frame = self.cap.read(slot)
+			if not ret or frame is None:
+				break
+			if frame is not slot:
+				# Backend allocated its own buffer (e.g. the stream changed size)
+				if frame.shape != slot.shape:
+					raise RuntimeError(
+						f"Frame shape {frame.shape} does not match chunk buffer {slot.shape}"
+					)
+				slot[...] = frame
+			n += 1
+
+		return out[:n]
+
+	def frame_shape(self):
+		width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+		height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+		return (height, width, 3)
 
 	def release(self):
 		self.cap.release()
\ No newline at end of file
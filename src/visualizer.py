@@ -1,18 +1,31 @@
 import cv2
 
+from camera_profiles import CameraProfileRegistry
+
 
 class Visualizer:
-    def __init__(self):
+    def __init__(self, profiles=None):
+        """
+        Args:
+            profiles: CameraProfileRegistry shared with SurfaceAnalyzer, so
+                      overlays highlight the same road polygon that is scored
+        """
+        self.profiles = profiles if profiles is not None else CameraProfileRegistry.load()
         self.color = {
             "litter_single": (0, 255, 255),
             "litter_cluster": (0, 0, 255)
         }
 
-    def draw_detections(self, frame, tracks):
+    def draw_detections(self, frame, tracks, transform=None):
+        """
+        transform: optional FrameTransform when tracks are in working-frame
+                   coordinates and frame is the native frame
+        """
         for track in tracks:
-            x1, y1, x2, y2 = track.bbox
+            bbox = track.bbox if transform is None else transform.to_native_bbox(track.bbox)
+            x1, y1, x2, y2 = bbox
 
-            cls = getattr(track, "class_name", "unknown")
+            cls = getattr(track, "cls", "unknown")
             conf = getattr(track, "confidence", None)
 
             if conf is None:
@@ -104,12 +117,10 @@ class Visualizer:
         return frame
 
     def draw_roi_overlay(self, frame, surface_score, dirt_distance):
-        h, w, _ = frame.shape
         surface_score = float(surface_score)
         dirt_distance = float(dirt_distance)
 
-        roi_x1 = int(w * 0.75)
-        roi_x2 = w
+        geometry = self.profiles.geometry(frame.shape)
 
         overlay = frame.copy()
 
@@ -123,27 +134,21 @@ class Visualizer:
         else:
             return frame
 
-        cv2.rectangle(
-            overlay,
-            (roi_x1, 0),
-            (roi_x2, h),
-            color,
-            -1
-        )
+        cv2.fillPoly(overlay, [geometry.polygon], color)
 
         cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0, frame)
 
         return frame
 
 
-    def draw(self, frame, tracks, segment_state, fps):
+    def draw(self, frame, tracks, segment_state, fps, transform=None):
         requires_cleaning = segment_state["requires_cleaning"]
         avg_score = float(segment_state["avg_score"])
         dirt_distance = float(segment_state["dirty_distance_m"])
         surface_score = float(segment_state["surface_score"])
 
         frame = self.draw_roi_overlay(frame, surface_score, dirt_distance)
-        frame = self.draw_detections(frame, tracks)
+        frame = self.draw_detections(frame, tracks, transform)
         frame = self.draw_banner(frame, requires_cleaning)
         frame = self.draw_metrics(frame, segment_state, fps)
 
@@ -151,10 +156,7 @@ class Visualizer:
 
 
     def draw_surface_roi(self, frame, surface_score, requires_cleaning):
-        h, w, _ = frame.shape
-
-        roi_x1 = int(w * 0.65)
-        roi_y1 = int(h * 0.65)
+        geometry = self.profiles.geometry(frame.shape)
 
         overlay = frame.copy()
 
@@ -166,13 +168,7 @@ class Visualizer:
                 color = (0, 255, 255)
                 alpha = 0.25
 
-            cv2.rectangle(
-                overlay,
-                (roi_x1, roi_y1),
-                (w, h),
-                color,
-                -1
-            )
+            cv2.fillPoly(overlay, [geometry.polygon], color)
 
             frame = cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0)
 
@@ -1,6 +1,30 @@
-import torch 
+import os
+import sys
+import time
+import shutil
+import hashlib
+import threading
+import cv2
 import numpy as np
-from ultralytics import YOLO
+
+from nms import nms
+from span_tracer import TRACER
+
+# torch / ultralytics are imported lazily in _load_model (seconds of cold start)
+
+MODEL_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sanitization", "models")
+
+LETTERBOX_FILL = 114
+MAX_WH = 7680       # class offset for batched NMS (ultralytics convention)
+MAX_NMS = 30000     # candidates kept before NMS
+
+
+def _file_hash(path, chunk_size = 1 << 20):
+	digest = hashlib.sha256()
+	with open(path, "rb") as f:
+		for chunk in iter(lambda: f.read(chunk_size), b""):
+			digest.update(chunk)
+	return digest.hexdigest()[:16]
 
 
 class YOLODetector:
@@ -8,6 +32,8 @@ class YOLODetector:
 	- Running YOLO inference on a frame
 	- Converting YOLO outputs into locked detection format
 	- Performing deterministic class mapping only
+	- Optionally restricting inference to the road region, whole or tiled
+	- Optionally bypassing the ultralytics predictor (lean path)
 	"""
 
 	def __init__(
@@ -17,7 +43,17 @@ class YOLODetector:
 		img_size: int = 640,
 		conf_threshold: float = 0.25,
 		iou_threshold: float = 0.45,
-		max_detections: int = 50
+		max_detections: int = 50,
+		road_region: dict = None,
+		tiled: bool = False,
+		tile_size: int = 640,
+		tile_overlap: float = 0.2,
+		tile_merge_threshold: float = 0.6,
+		compiled_format: str = None,
+		cache_dir: str = None,
+		background_load: bool = False,
+		lean: bool = False,
+		img_sizes: list = None
 	):
 
 		"""
@@ -35,54 +71,297 @@ class YOLODetector:
 
 		max_detections:
 			Hard cap to prevent pathological overload 
-		"""
 
-		if device is None:
-			device = "cuda" if torch.cuda.is_available() else "cpu"
+		road_region:
+			CameraProfileRegistry (bounding crop of the active road polygon,
+			follows runtime profile switches) or a ratio dict (x_start_ratio,
+			x_end_ratio, y_start_ratio, y_end_ratio). None = full frame
+
+		tiled:
+			Split the road region into overlapping tiles run as one batch
+			(small litter keeps native resolution instead of being downscaled)
+
+		tile_size:
+			Tile edge in frame pixels
+
+		tile_overlap:
+			Fraction of tile_size shared by neighbouring tiles
+
+		tile_merge_threshold:
+			Intersection over the smaller box above which detections from
+			different tiles are merged into one
+
+		compiled_format:
+			Ultralytics export format (e.g. "torchscript", "openvino") persisted
+			under cache_dir in a directory keyed by model hash, img_size and
+			format; the exporter's own file / directory name is kept since
+			ultralytics picks the backend from it. None = load .pt
+
+		cache_dir:
+			Compiled model cache location (default MODEL_CACHE_DIR)
+
+		background_load:
+			Import, load and warm up in a thread so the caller can open the
+			video source meanwhile; detect() waits until ready
+
+		lean:
+			Call the torch module directly under torch.inference_mode() with
+			cached letterbox geometry, preallocated input tensors and a fused
+			decode + NMS (no predictor setup or Results objects per call).
+			Supported for .pt and "torchscript" models, other compiled formats
+			keep the predictor. Check with lean_parity()
+
+		img_sizes:
+			Extra inference sizes set_img_size() may switch to (e.g. the
+			quality controller's levels). Compiled artifacts for them are
+			built / loaded on the loader thread after the main size is ready,
+			never on demand while throttling
+		"""
 
+		self.model_path = model_path
 		self.device = device
 		self.img_size = img_size
 		self.conf_threshold = conf_threshold
 		self.iou_threshold = iou_threshold
 		self.max_detections = max_detections
-		self.model = YOLO(model_path)
-		self.model.to(self.device)
+		self.road_region = road_region
+		self.tiled = tiled
+		self.tile_size = tile_size
+		self.tile_overlap = tile_overlap
+		self.tile_merge_threshold = tile_merge_threshold
+		self.compiled_format = compiled_format
+		self.cache_dir = cache_dir or MODEL_CACHE_DIR
+		self.lean = lean
+		self.img_sizes = sorted(set(img_sizes or []) - {img_size})
+
+		# Decided once, before loading: a missing .pt is auto-downloaded by
+		# the first YOLO() call and must not flip this mid-load
+		self.compiled = compiled_format is not None and os.path.exists(model_path)
+
+		self.model = None
+		self.load_timings = {}
+		self._load_error = None
+		self._loader = None
+		self._ready = threading.Event()
+
+		# Compiled models have a fixed input size: one model per size. The main
+		# size gates detect(); extra sizes follow in the background (exporting
+		# on demand while throttled would make it worse)
+		self._models = {}
+
+		# Lean path: module per img_size (one shared entry for .pt), letterbox
+		# geometry per (crop shape, img_size), input buffers per batch layout
+		self._lean_modules = {}
+		self._letterbox = {}
+		self._inputs = {}
+
+		if background_load:
+			self._loader = threading.Thread(target = self._load_and_warmup, daemon = True)
+		else:
+			self._load_model()
+			self.warmup()
+			self._ready.set()
+			self._loader = threading.Thread(target = self._prepare_sizes, daemon = True)
+		self._loader.start()
+
+	def _load_and_warmup(self):
+		try:
+			self._load_model()
+			self.warmup()
+		except Exception as e:
+			self._load_error = e
+			return
+		finally:
+			self._ready.set()
+
+		self._prepare_sizes()
+
+	def _prepare_sizes(self):
+		"""
+		Build / load compiled models for img_sizes (after the main size is ready)
+		"""
+
+		if not self.compiled:
+			return
+
+		start = time.perf_counter()
+		for img_size in self.img_sizes:
+			if img_size in self._models:
+				continue
+			try:
+				model = self._build_model(img_size)
+				self._build_lean(img_size)
+				self._models[img_size] = model
+			except Exception as e:
+				print(f"YOLODetector: could not prepare img_size={img_size}: {e}")
+		self.load_timings["extra_sizes"] = time.perf_counter() - start
+
+	def wait_ready(self):
+		"""
+		Block until the main model is loaded and warm (re-raises a load error)
+		"""
+
+		self._ready.wait()
+		if self._load_error is not None:
+			raise self._load_error
+
+	def compiled_model_dir(self, img_size = None):
+		"""
+		Cache directory of the compiled artifact for this model file and img_size
+		"""
+
+		stem = os.path.splitext(os.path.basename(self.model_path))[0]
+		model_hash = _file_hash(self.model_path)
+		return os.path.join(
+			self.cache_dir,
+			f"{stem}-{model_hash}-{img_size or self.img_size}-{self.compiled_format}"
+		)
+
+	def compiled_model_path(self, img_size = None):
+		"""
+		Cached artifact under its export name (e.g. yolov8n.torchscript,
+		yolov8n_openvino_model/), None if not built yet
+		"""
+
+		directory = self.compiled_model_dir(img_size)
+		if not os.path.isdir(directory):
+			return None
+
+		entries = sorted(os.listdir(directory))
+		return os.path.join(directory, entries[0]) if entries else None
+
+	def _load_model(self):
+		start = time.perf_counter()
+
+		import torch
+		import ultralytics  # noqa: F401 (timed here, used in _build_model)
+
+		self.load_timings["import"] = time.perf_counter() - start
+
+		if self.device is None:
+			self.device = "cuda" if torch.cuda.is_available() else "cpu"
+
+		start = time.perf_counter()
+		self.model = self._build_model(self.img_size)
+		self._models[self.img_size] = self.model
+		self._build_lean(self.img_size)
+		self.load_timings["load"] = time.perf_counter() - start
+
+	def _build_model(self, img_size):
+		from ultralytics import YOLO
+
+		if not self.compiled:
+			model = YOLO(self.model_path)
+			model.to(self.device)
+			return model
+
+		compiled_path = self.compiled_model_path(img_size)
+
+		if compiled_path is None:
+			export_start = time.perf_counter()
+			exported = str(YOLO(self.model_path).export(
+				format = self.compiled_format,
+				imgsz = img_size,
+				device = self.device,
+				verbose = False
+			)).rstrip(os.sep)
+
+			# Assembled aside and renamed into place (no half-built entries)
+			directory = self.compiled_model_dir(img_size)
+			tmp_dir = directory + ".tmp"
+			shutil.rmtree(tmp_dir, ignore_errors = True)
+			os.makedirs(tmp_dir)
+			shutil.move(exported, os.path.join(tmp_dir, os.path.basename(exported)))
+			os.replace(tmp_dir, directory)
+
+			compiled_path = self.compiled_model_path(img_size)
+			self.load_timings["compile"] = time.perf_counter() - export_start
+
+		return YOLO(compiled_path, task = "detect")
+
+	def _lean_key(self, img_size):
+		return img_size if self.compiled else None
+
+	def _build_lean(self, img_size):
+		"""
+		Plain torch module for the lean path
+
+		.pt: the fused DetectionModel inside the YOLO wrapper (any input
+		size, batched). torchscript: the cached artifact (fixed square
+		img_size input, one crop per call)
+		"""
+
+		if not self.lean:
+			return
+
+		import torch
+
+		if not self.compiled:
+			module = self.model.model
+			if hasattr(module, "fuse"):
+				module = module.fuse(verbose = False)
+			stride = max(int(module.stride.max()), 32)
+			fixed = False
+		elif self.compiled_format == "torchscript":
+			module = torch.jit.load(self.compiled_model_path(img_size), map_location = self.device)
+			stride = 32
+			fixed = True
+		else:
+			return
+
+		module.eval()
+		self._lean_modules[self._lean_key(img_size)] = (module, stride, fixed)
+
+	def set_img_size(self, img_size):
+		"""
+		Change inference resolution at runtime (quality controller knob)
+
+		.pt models switch to any size. Compiled models switch only to sizes
+		prepared at load time (img_sizes); others are ignored.
+		"""
 
-		self.warmup()
+		if img_size == self.img_size:
+			return
+
+		if not self.compiled:
+			self.img_size = img_size
+			return
+
+		if img_size not in self._models:
+			if img_size in self.img_sizes:
+				print(f"YOLODetector: img_size={img_size} still being prepared")
+			else:
+				print(f"YOLODetector: img_size={img_size} not prepared (pass it in img_sizes)")
+			return
+
+		self.model = self._models[img_size]
+		self.img_size = img_size
 
 	def warmup(self):
 		"""
 		single warmup inference to stabilize first-frame latency 
 		"""
 
+		start = time.perf_counter()
+
 		dummy = np.zeros((self.img_size, self.img_size, 3), dtype = np.uint8)
-		_ = self.model(
-			dummy,
-			imgsz = self.img_size,
-			conf = self.conf_threshold,
-			iou = self.iou_threshold,
-			verbose = False
-		)
+		self._infer([dummy])
 
-	def detect(self, frame):
+		self.load_timings["warmup"] = time.perf_counter() - start
+
+	def _infer(self, images):
 		"""
-		Args:
-			frame: BGR image (numpy array)
+		Run the model on a list of BGR crops
 
 		Returns:
-			List of detections in locked format:
-			{
-				"bbox": [x1, y1, x2, y2],
-				"class": "litter_single" | "litter_cluster",
-				"confidence": float
-			}
+			list of (N, 5) float arrays (x1, y1, x2, y2, conf) in crop pixels
 		"""
 
-		height, width = frame.shape[:2]
-		detections = []
+		if self._lean_module() is not None:
+			return self._infer_lean(images)
 
 		results = self.model(
-			frame,
+			images if len(images) > 1 else images[0],
 			imgsz = self.img_size,
 			conf = self.conf_threshold,
 			iou = self.iou_threshold,
@@ -91,18 +370,268 @@ class YOLODetector:
 			verbose = False
 		)
 
-		if not results:
-			return detections
+		return [
+			result.boxes.data[:, :5].cpu().numpy() if result.boxes is not None
+			else np.zeros((0, 5), dtype = np.float32)
+			for result in results
+		]
+
+	def _lean_module(self):
+		if not self.lean:
+			return None
+		return self._lean_modules.get(self._lean_key(self.img_size))
+
+	def _letterbox_geometry(self, shape, auto, stride):
+		"""
+		Cached letterbox layout for a crop shape (ultralytics LetterBox rules)
+
+		Returns:
+			(new_w, new_h, left, top, out_w, out_h)
+		"""
+
+		key = (shape[0], shape[1], self.img_size, auto, stride)
+		geometry = self._letterbox.get(key)
+		if geometry is not None:
+			return geometry
+
+		height, width = shape[:2]
+		r = min(self.img_size / height, self.img_size / width)
+		new_w = int(round(width * r))
+		new_h = int(round(height * r))
+
+		pad_w = self.img_size - new_w
+		pad_h = self.img_size - new_h
+		if auto:
+			# Minimal rectangle: pad only to the next stride multiple
+			pad_w %= stride
+			pad_h %= stride
+
+		left = int(round(pad_w / 2 - 0.1))
+		top = int(round(pad_h / 2 - 0.1))
+		right = int(round(pad_w / 2 + 0.1))
+		bottom = int(round(pad_h / 2 + 0.1))
+
+		geometry = (new_w, new_h, left, top, new_w + left + right, new_h + top + bottom)
+		self._letterbox[key] = geometry
+		return geometry
+
+	def _input_buffers(self, batch, out_h, out_w, layout):
+		"""
+		Preallocated host (uint8 NHWC) and model input (float NCHW) buffers
+
+		Padding is filled once per layout; the resized area is overwritten
+		every call.
+		"""
+
+		import torch
+
+		key = (batch, out_h, out_w)
+		entry = self._inputs.get(key)
+
+		if entry is None:
+			host = np.full((batch, out_h, out_w, 3), LETTERBOX_FILL, dtype = np.uint8)
+			tensor = torch.empty((batch, 3, out_h, out_w), dtype = torch.float32, device = self.device)
+			entry = [host, tensor, layout]
+			self._inputs[key] = entry
+		elif entry[2] != layout:
+			entry[0].fill(LETTERBOX_FILL)
+			entry[2] = layout
+
+		return entry[0], entry[1]
+
+	def _infer_lean(self, images):
+		module, stride, fixed = self._lean_module()
+
+		if fixed:
+			# Fixed-shape artifact: square img_size, one crop per call
+			results = []
+			for image in images:
+				results.extend(self._forward_lean(module, [image], False, stride))
+			return results
+
+		same_shapes = len({image.shape for image in images}) == 1
+		return self._forward_lean(module, images, same_shapes, stride)
+
+	def _forward_lean(self, module, images, auto, stride):
+		import torch
+
+		geometries = [self._letterbox_geometry(image.shape, auto, stride) for image in images]
+		out_w = max(g[4] for g in geometries)
+		out_h = max(g[5] for g in geometries)
+
+		host, tensor = self._input_buffers(len(images), out_h, out_w, tuple(geometries))
+
+		for i, (image, (new_w, new_h, left, top, _, _)) in enumerate(zip(images, geometries)):
+			view = host[i, top:top + new_h, left:left + new_w]
+			if image.shape[:2] == (new_h, new_w):
+				np.copyto(view, image)
+			else:
+				cv2.resize(image, (new_w, new_h), dst = view, interpolation = cv2.INTER_LINEAR)
+			cv2.cvtColor(view, cv2.COLOR_BGR2RGB, dst = view)
+
+		with torch.inference_mode():
+			tensor.copy_(torch.from_numpy(host).permute(0, 3, 1, 2))
+			tensor.mul_(1.0 / 255.0)
+
+			output = module(tensor)
+			if isinstance(output, (list, tuple)):
+				output = output[0]
+
+			kept = self._decode_nms(output)
+
+		results = []
+		for boxes, image in zip(kept, images):
+			results.append(self._scale_boxes(boxes, image.shape, out_h, out_w))
+
+		return results
+
+	def _decode_nms(self, output):
+		"""
+		Fused decode + class-aware NMS on raw head output
+
+		output: (B, 4 + num_classes, anchors), boxes as cx, cy, w, h
+		Returns list of (N, 5) arrays (x1, y1, x2, y2, conf) in input pixels
+		"""
+
+		import torch
+		from torchvision.ops import nms as torch_nms
+
+		kept = []
+		for pred in output.transpose(1, 2):
+			scores, classes = pred[:, 4:].max(1)
+			candidates = scores > self.conf_threshold
+
+			pred = pred[candidates]
+			scores = scores[candidates]
+			classes = classes[candidates]
+
+			if scores.numel() == 0:
+				kept.append(np.zeros((0, 5), dtype = np.float32))
+				continue
+
+			if scores.numel() > MAX_NMS:
+				top = scores.topk(MAX_NMS).indices
+				pred, scores, classes = pred[top], scores[top], classes[top]
+
+			xy = pred[:, :2]
+			half_wh = pred[:, 2:4] / 2
+			boxes = torch.cat((xy - half_wh, xy + half_wh), 1)
+
+			# Offsetting by class keeps NMS within each class in one call
+			keep = torch_nms(boxes + classes[:, None].float() * MAX_WH, scores, self.iou_threshold)
+			keep = keep[:self.max_detections]
+
+			kept.append(torch.cat((boxes[keep], scores[keep, None]), 1).cpu().numpy())
+
+		return kept
+
+	def _scale_boxes(self, boxes, shape, out_h, out_w):
+		"""
+		Undo the letterbox: input pixels -> crop pixels (clipped)
+		"""
+
+		if len(boxes) == 0:
+			return boxes
+
+		height, width = shape[:2]
+		gain = min(out_h / height, out_w / width)
+		pad_x = round((out_w - width * gain) / 2 - 0.1)
+		pad_y = round((out_h - height * gain) / 2 - 0.1)
+
+		boxes[:, [0, 2]] = ((boxes[:, [0, 2]] - pad_x) / gain).clip(0, width)
+		boxes[:, [1, 3]] = ((boxes[:, [1, 3]] - pad_y) / gain).clip(0, height)
+
+		return boxes
+
+	def set_road_region(self, road_region):
+		"""
+		Switch the inference region at runtime (None = full frame)
+		"""
+
+		self.road_region = road_region
+
+	def _road_bounds(self, width, height):
+		"""
+		Pixel bounds (x1, y1, x2, y2) of the road region for this frame size
+		"""
+
+		if self.road_region is None:
+			return 0, 0, width, height
+
+		if hasattr(self.road_region, "geometry"):
+			return self.road_region.geometry((height, width)).bbox
+
+		x1 = int(width * self.road_region["x_start_ratio"])
+		x2 = int(width * self.road_region["x_end_ratio"])
+		y1 = int(height * self.road_region["y_start_ratio"])
+		y2 = int(height * self.road_region["y_end_ratio"])
+
+		return x1, y1, x2, y2
+
+	def _tile_starts(self, start, end):
+		"""
+		Tile origins along one axis, last tile flush with the region end
+		"""
+
+		length = end - start
+		if length <= self.tile_size:
+			return [start]
+
+		stride = max(1, int(self.tile_size * (1.0 - self.tile_overlap)))
+		starts = list(range(start, end - self.tile_size, stride))
+		starts.append(end - self.tile_size)
+
+		return starts
+
+	def _crops(self, frame):
+		"""
+		Returns list of (crop, x_offset, y_offset) to run inference on
+		"""
+
+		height, width = frame.shape[:2]
+		x1, y1, x2, y2 = self._road_bounds(width, height)
+
+		if not self.tiled:
+			return [(frame[y1:y2, x1:x2], x1, y1)]
+
+		# Tiles never reach past the road region (regions smaller than a tile)
+		crops = []
+		for ty in self._tile_starts(y1, y2):
+			for tx in self._tile_starts(x1, x2):
+				tile = frame[ty:min(ty + self.tile_size, y2), tx:min(tx + self.tile_size, x2)]
+				crops.append((tile, tx, ty))
+
+		return crops
+
+	@staticmethod
+	def _area_class(box_area, frame_area):
+		area_ratio = box_area / frame_area
+
+		# This is where dust heavy regions get implicitly treated as clusters without introducing a dust class
+
+		if area_ratio >= 0.02:
+			return "litter_cluster"
+		return "litter_single"
+
+	def _to_detections(self, boxes, x_offset, y_offset, width, height):
+		"""
+		Map YOLO boxes of one crop back to frame coordinates in locked format
+
+		boxes: (N, 5) array of x1, y1, x2, y2, conf in crop pixels
+		"""
+
+		detections = []
 
-		boxes = results[0].boxes
 		if boxes is None or len(boxes) == 0:
 			return detections 
 
-		for box in boxes:
-			xyxy = box.xyxy[0].cpu().numpy()
-			conf = float(box.conf[0].cpu().numpy())
+		for row in boxes:
+			x1, y1, x2, y2, conf = row[:5].tolist()
 
-			x1, y1, x2, y2 = xyxy.tolist()
+			x1 += x_offset
+			x2 += x_offset
+			y1 += y_offset
+			y2 += y_offset
 
 			x1 = max(0, min(x1, width - 1))
 			y1 = max(0, min(y1, height - 1))
@@ -117,34 +646,148 @@ class YOLODetector:
 			if box_area <= 0:
 				continue 
 
-			area_ratio = box_area / frame_area
-
-			# This is where dust heavy regions get implicitly treated as clusters without introducing a dust class
-
-			if area_ratio >= 0.02:
-				mapped_class = "litter_cluster"
-			else:
-				mapped_class = "litter_single"
-
-
 			detections.append(
 				{
 					"bbox": [int(x1), int(y1), int(x2), int(y2)],
-					"class": mapped_class,
+					"class": self._area_class(box_area, frame_area),
 					"confidence": conf
 				}
 			)
 
+		return detections
+
+	def detect(self, frame):
+		"""
+		Args:
+			frame: BGR image (numpy array)
+
+		Returns:
+			List of detections in locked format:
+			{
+				"bbox": [x1, y1, x2, y2],
+				"class": "litter_single" | "litter_cluster",
+				"confidence": float
+			}
+		"""
+
+		self.wait_ready()
+
+		height, width = frame.shape[:2]
+		detections = []
+
+		crops = self._crops(frame)
+		crops = [c for c in crops if c[0].shape[0] > 0 and c[0].shape[1] > 0]
+		if not crops:
+			return detections
+
+		# Tiles go through the model as a single batch
+		with TRACER.span("detect.inference", crops = len(crops), lean = self._lean_module() is not None):
+			results = self._infer([c[0] for c in crops])
+
+		if not results:
+			return detections
+
+		with TRACER.span("detect.postprocess"):
+			tile_ids = []
+			for tile_id, ((_, x_offset, y_offset), boxes) in enumerate(zip(crops, results)):
+				tile_detections = self._to_detections(boxes, x_offset, y_offset, width, height)
+				detections.extend(tile_detections)
+				tile_ids.extend([tile_id] * len(tile_detections))
+
+			if len(crops) > 1:
+				# Same object seen by overlapping tiles: a box cut at a tile edge
+				# has low IoU with the full box, so merge across tiles on
+				# intersection over the smaller area (within a tile the model's
+				# own NMS already ran)
+				detections = nms(
+					detections,
+					self.tile_merge_threshold,
+					metric = "ios",
+					groups = tile_ids,
+					merge = True
+				)[:self.max_detections]
+
+				# A merged box is the union of its parts: map its class again
+				for det in detections:
+					x1, y1, x2, y2 = det["bbox"]
+					det["class"] = self._area_class((x2 - x1) * (y2 - y1), width * height)
+
 		return detections 
 
 
+def lean_parity(detector, frames, box_tolerance = 2.0, conf_tolerance = 0.02):
+	"""
+	Compare the lean path against the ultralytics predictor on the same frames
+
+	Detections are matched to the nearest box; the lean path passes when every frame has
+	the same count and matched boxes / confidences agree within tolerance.
+
+	Args:
+		detector: YOLODetector constructed with lean = True
+		frames: iterable of BGR frames
+		box_tolerance: max corner deviation in frame pixels
+		conf_tolerance: max confidence deviation
+
+	Returns:
+		dict with frames, count_mismatches, max_box_error, max_conf_error, passed
+	"""
+
+	if not detector.lean:
+		raise ValueError("lean_parity needs a detector built with lean = True")
+
+	detector.wait_ready()
 
+	report = {"frames": 0, "count_mismatches": 0, "max_box_error": 0.0, "max_conf_error": 0.0}
 
+	for frame in frames:
+		detector.lean = False
+		try:
+			reference = detector.detect(frame)
+		finally:
+			detector.lean = True
+		lean = detector.detect(frame)
 
+		report["frames"] += 1
+		if len(reference) != len(lean):
+			report["count_mismatches"] += 1
 
+		unmatched = list(lean)
+		for det in reference:
+			if not unmatched:
+				break
+
+			ref_box = np.array(det["bbox"], dtype = np.float32)
+			errors = [np.abs(ref_box - np.array(other["bbox"], dtype = np.float32)).max() for other in unmatched]
+			best = int(np.argmin(errors))
+
+			report["max_box_error"] = max(report["max_box_error"], float(errors[best]))
+			report["max_conf_error"] = max(
+				report["max_conf_error"],
+				abs(det["confidence"] - unmatched[best]["confidence"])
+			)
+			unmatched.pop(best)
 
+	report["passed"] = (
+		report["count_mismatches"] == 0
+		and report["max_box_error"] <= box_tolerance
+		and report["max_conf_error"] <= conf_tolerance
+	)
 
+	return report
 
 
+if __name__ == "__main__":
+	# python yolo_detector.py ride.mp4 [max_frames]
+	source = sys.argv[1]
+	max_frames = int(sys.argv[2]) if len(sys.argv) > 2 else 200
 
+	cap = cv2.VideoCapture(source)
+	frames = []
+	while len(frames) < max_frames:
+		ret, frame = cap.read()
+		if not ret:
+			break
+		frames.append(frame)
+	cap.release()
 
+	print(lean_parity(YOLODetector(lean = True), frames))